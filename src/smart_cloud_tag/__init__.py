@@ -4,6 +4,7 @@ from .exceptions import (
     SmartCloudTagError,
     SchemaValidationError,
     LLMError,
+    LLMTransientError,
     StorageError,
 )
 
@@ -15,5 +16,6 @@ __all__ = [
     "SmartCloudTagError",
     "SchemaValidationError",
     "LLMError",
+    "LLMTransientError",
     "StorageError",
 ]
\ No newline at end of file
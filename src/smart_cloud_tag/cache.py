@@ -0,0 +1,85 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import diskcache
+
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+    diskcache = None
+
+from .exceptions import ConfigurationError
+from .models import LLMRequest, LLMResponse
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        directory: Optional[str] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Response and the monotonic time it expires at (None if never)
+        self._entries: "OrderedDict[str, Tuple[LLMResponse, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._disk = None
+
+        if directory:
+            if not DISKCACHE_AVAILABLE:
+                raise ConfigurationError(
+                    "Persistent LLM cache not available. Install with: pip install smart_cloud_tag[cache]"
+                )
+            self._disk = diskcache.Cache(os.path.expanduser(directory))
+
+    @staticmethod
+    def make_key(model: str, request: LLMRequest) -> str:
+        payload = f"{model}\0{request.model_dump_json()}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                response, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return response
+                del self._entries[key]
+
+        if self._disk is not None:
+            raw = self._disk.get(key)
+            if raw is not None:
+                response = LLMResponse.model_validate_json(raw)
+                self._remember(key, response)
+                return response
+
+        return None
+
+    def set(self, key: str, response: LLMResponse) -> None:
+        self._remember(key, response)
+        if self._disk is not None:
+            # diskcache drops expired entries itself
+            self._disk.set(key, response.model_dump_json(), expire=self.ttl)
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+
+    def _remember(self, key: str, response: LLMResponse) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -2,17 +2,17 @@
 Configuration constants and default values for smart_cloud_tag.
 """
 
-# Default LLM prompt template
+# Default LLM prompt template. Everything that is the same for all objects of
+# a run comes first, so that providers can reuse the cached prompt prefix; the
+# filename and content of each object come last.
 DEFAULT_PROMPT_TEMPLATE = """Analyze the following content and generate exactly {num_tags} tag values.
 
 Tag keys and constraints:
-{constraints_text}{filename_context}
-Content preview:
-{content_preview}
+{constraints_text}
 
 Instructions:
 1. Generate exactly {num_tags} values, one for each tag key
-2. Return only the values in order, separated by commas
+2. Return a JSON object with one string property per tag key, named exactly as listed above
 3. Keep values concise (1-3 words when possible)
 4. Make values relevant and descriptive for the content
 5. For tags with allowed values, use only those values
@@ -26,10 +26,13 @@ File Context Guidelines:
 - Use filename context to inform your understanding of the document type and content
 - However, if the filename is not relevant to the content, ignore it
 
-Example output format:
-value1, value2, value3
+Example output format, for the tag keys "type" and "department":
+{{"type": "invoice", "department": "finance"}}
+{filename_context}
+Content preview:
+{content_preview}
 
-Generated tags:"""
+JSON object:"""
 
 # Default model configurations
 DEFAULT_MODELS = {
@@ -38,6 +41,62 @@ DEFAULT_MODELS = {
     "gemini": "gemini-1.5-pro",
 }
 
+# Upper bound (exclusive) on the number of tag keys in a tagging config
+MAX_TAG_KEYS = 10
+
 # Default configuration values
 DEFAULT_MAX_BYTES = 5000
 DEFAULT_LLM_PROVIDER = "openai"
+
+# Tag recording the content version and tag schema an object was last tagged with
+FINGERPRINT_TAG_KEY = "smart_cloud_tag_fingerprint"
+
+# Default number of objects processed concurrently
+DEFAULT_MAX_WORKERS = 16
+
+# Objects listed ahead of the workers, per worker, while a bucket is processed
+IN_FLIGHT_OBJECTS_PER_WORKER = 2
+
+# Default number of parallel range requests used to download large objects
+DEFAULT_DOWNLOAD_CONCURRENCY = 8
+
+# Size of each range request when an object is downloaded in parallel
+RANGE_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Size of the reads used to copy a downloaded range into the object buffer
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Write buffer of the JSON Lines file results are streamed to
+RESULTS_BUFFER_BYTES = 1024 * 1024
+
+# Default time a partial LLM batch waits for more requests before it is sent
+DEFAULT_LLM_BATCH_WAIT_MS = 50
+
+# Default number of requests a provider sends in parallel for one batch
+DEFAULT_LLM_CONCURRENCY = 20
+
+# Seconds between status checks of a submitted OpenAI Batch API job
+DEFAULT_BATCH_POLL_SECONDS = 30
+
+# Default seconds a run waits for a Batch API job before cancelling it
+DEFAULT_BATCH_TIMEOUT_SECONDS = 24 * 60 * 60
+
+# Seconds a cancelled Batch API job is given to finish cancelling, after which
+# none of its output is used
+BATCH_CANCEL_GRACE_SECONDS = 10 * 60
+
+# Size of the Batch API jobs a run is split into. The API accepts up to 50,000
+# requests and a 200 MB input file per job; the prompt bound leaves room for
+# the request envelope and multi-byte characters.
+BATCH_API_MAX_REQUESTS = 50_000
+BATCH_API_MAX_PROMPT_BYTES = 50 * 1024 * 1024
+
+# Default number of retries for rate-limited or transient LLM failures
+DEFAULT_MAX_RETRIES = 5
+
+# Bounds of the randomized exponential backoff between retries
+RETRY_MIN_WAIT_SECONDS = 1
+RETRY_MAX_WAIT_SECONDS = 60
+
+# Minimum size of the keep-alive connection pools used by the LLM and storage clients
+DEFAULT_MAX_CONNECTIONS = 64
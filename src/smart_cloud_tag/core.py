@@ -1,10 +1,45 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
 import os
-from typing import Dict, Optional, Any, List
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from .cache import LLMResponseCache
+from .retry import RateLimiter, with_batch_retries, with_retries
+from .config import (
+    BATCH_API_MAX_PROMPT_BYTES,
+    BATCH_API_MAX_REQUESTS,
+    DEFAULT_BATCH_TIMEOUT_SECONDS,
+    DEFAULT_DOWNLOAD_CONCURRENCY,
+    DEFAULT_LLM_BATCH_WAIT_MS,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MAX_WORKERS,
+    FINGERPRINT_TAG_KEY,
+    IN_FLIGHT_OBJECTS_PER_WORKER,
+    RESULTS_BUFFER_BYTES,
+)
 from .models import (
     TaggingConfig,
     TaggingResult,
+    ObjectTags,
     ProcessingMode,
     LLMRequest,
+    LLMResponse,
 )
 from .providers import (
     AWSS3Provider,
@@ -15,20 +50,27 @@ from .providers import (
     GCS_AVAILABLE,
 )
 from .llm import (
+    BatchingLLMClient,
+    OpenAIBatchProvider,
     OpenAIProvider,
-    AnthropicProvider,
-    GeminiProvider,
     OPENAI_AVAILABLE,
     ANTHROPIC_AVAILABLE,
     GEMINI_AVAILABLE,
 )
 from .utils import (
+    PLAIN_TEXT_FILE_TYPES,
+    compile_llm_prompt,
+    decode_text_content,
+    object_fingerprint,
     parse_file_content,
+    prefetch,
+    render_llm_prompt,
     truncate_content,
 )
 from .schemas import (
     validate_tagging_config,
     create_tag_mapping,
+    is_fully_tagged,
     merge_and_validate_tags,
     create_object_tags_result,
 )
@@ -37,6 +79,25 @@ from .exceptions import (
     ConfigurationError,
 )
 
+# Called with the number of finished objects and the number listed so far
+ProgressCallback = Callable[[int, int], None]
+
+# Existing tags, the LLM request and the change fingerprint (when tracked) of an
+# object awaiting tag generation
+PreparedObject = Tuple[Dict[str, str], LLMRequest, Optional[str]]
+
+# An object that is ready for tag generation, or its final result when it is
+# skipped or fails before that
+Prepared = Union[ObjectTags, PreparedObject]
+
+# The result future, key, existing tags and change fingerprint of an object
+# waiting for a Batch API job
+PendingObject = Tuple["Future[ObjectTags]", str, Dict[str, str], Optional[str]]
+
+# A request of a Batch API job, its response cache key and the objects waiting
+# for its response (more than one when content is deduplicated)
+BatchSlot = Tuple[LLMRequest, Optional[str], List[PendingObject]]
+
 
 class SmartCloudTagger:
     def __init__(
@@ -47,6 +108,21 @@ class SmartCloudTagger:
         llm_provider: str = "openai",
         max_bytes: Optional[int] = 5000,
         custom_prompt_template: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        llm_batch_size: Optional[int] = None,
+        llm_batch_wait_ms: int = DEFAULT_LLM_BATCH_WAIT_MS,
+        download_concurrency: int = DEFAULT_DOWNLOAD_CONCURRENCY,
+        cache_enabled: bool = True,
+        cache_dir: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        skip_fully_tagged: bool = False,
+        track_changes: bool = False,
+        rate_limit_rpm: Optional[int] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        parse_workers: Optional[int] = None,
+        dedupe_content: bool = False,
+        use_batch_api: bool = False,
+        batch_api_timeout: float = DEFAULT_BATCH_TIMEOUT_SECONDS,
     ):
         self.storage_uri = storage_uri
         self.tags = tags
@@ -54,6 +130,21 @@ class SmartCloudTagger:
         self.llm_provider_type = llm_provider.lower()
         self.max_bytes = max_bytes
         self.custom_prompt_template = custom_prompt_template
+        self.max_workers = max_workers
+        self.llm_batch_size = llm_batch_size
+        self.llm_batch_wait_ms = llm_batch_wait_ms
+        self.download_concurrency = download_concurrency
+        self.cache_enabled = cache_enabled
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.skip_fully_tagged = skip_fully_tagged
+        self.track_changes = track_changes
+        self.rate_limit_rpm = rate_limit_rpm
+        self.max_retries = max_retries
+        self.parse_workers = parse_workers
+        self.dedupe_content = dedupe_content
+        self.use_batch_api = use_batch_api
+        self.batch_api_timeout = batch_api_timeout
 
         self.storage_provider_type = self._detect_storage_provider(storage_uri)
 
@@ -62,6 +153,36 @@ class SmartCloudTagger:
                 "llm_provider must be 'openai', 'anthropic', or 'gemini'"
             )
 
+        if max_workers < 1:
+            raise ConfigurationError("max_workers must be at least 1")
+
+        if llm_batch_size is not None and llm_batch_size < 1:
+            raise ConfigurationError("llm_batch_size must be at least 1")
+
+        if download_concurrency < 1:
+            raise ConfigurationError("download_concurrency must be at least 1")
+
+        if rate_limit_rpm is not None and rate_limit_rpm <= 0:
+            raise ConfigurationError("rate_limit_rpm must be positive")
+
+        if cache_ttl is not None and cache_ttl <= 0:
+            raise ConfigurationError("cache_ttl must be positive")
+
+        if max_retries < 0:
+            raise ConfigurationError("max_retries cannot be negative")
+
+        if batch_api_timeout <= 0:
+            raise ConfigurationError("batch_api_timeout must be positive")
+
+        if parse_workers is not None and parse_workers < 1:
+            raise ConfigurationError("parse_workers must be at least 1")
+
+        if use_batch_api:
+            if self.llm_provider_type != "openai":
+                raise ConfigurationError(
+                    "use_batch_api is only supported with the openai provider"
+                )
+
         if not llm_model:
             from .config import DEFAULT_MODELS
 
@@ -79,14 +200,43 @@ class SmartCloudTagger:
         except Exception as e:
             raise ConfigurationError(f"Invalid configuration: {str(e)}")
 
+        # Snapshot of the tag keys shared by every object of a run
+        self._tag_keys = tuple(self.config.tags.keys())
+        try:
+            self._compiled_prompt = compile_llm_prompt(
+                self.config.tags, custom_prompt_template
+            )
+        except ValueError as e:
+            raise ConfigurationError(f"Invalid prompt template: {str(e)}")
+
+        # Size the keep-alive pools so that every worker, and every range
+        # request of a parallel download, can reuse an open connection
+        self._llm_max_connections = max(DEFAULT_MAX_CONNECTIONS, max_workers)
+        self._storage_max_connections = max(
+            DEFAULT_MAX_CONNECTIONS, max_workers * download_concurrency
+        )
+
         self._init_storage_provider()
         self._init_llm_provider()
 
-        if not self.storage_provider.is_supported_file_type("test.txt"):
-            raise ConfigurationError("Storage provider not properly configured")
-
-        if not self.llm_provider.is_available():
-            raise ConfigurationError("LLM provider not available")
+        self._response_cache = (
+            LLMResponseCache(directory=cache_dir, ttl=cache_ttl)
+            if cache_enabled
+            else None
+        )
+        self._rate_limiter = RateLimiter(rate_limit_rpm) if rate_limit_rpm else None
+        # Worker processes are only started once the first file is parsed, by
+        # which time the worker, listing and batching threads are running.
+        # Forking a process with live threads can copy locks held by them, so
+        # the workers are spawned fresh instead.
+        self._parse_pool = (
+            ProcessPoolExecutor(
+                max_workers=parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if parse_workers
+            else None
+        )
 
     def _detect_storage_provider(self, storage_uri: str) -> str:
         storage_uri_lower = storage_uri.lower()
@@ -109,7 +259,10 @@ class SmartCloudTagger:
                 raise ConfigurationError(
                     "AWS provider not available. Install with: pip install smart_cloud_tag[aws]"
                 )
-            self.storage_provider = AWSS3Provider(storage_uri=self.storage_uri)
+            self.storage_provider = AWSS3Provider(
+                storage_uri=self.storage_uri,
+                max_connections=self._storage_max_connections,
+            )
 
         elif self.storage_provider_type == "azure":
             azure_connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
@@ -124,6 +277,7 @@ class SmartCloudTagger:
             self.storage_provider = AzureBlobProvider(
                 storage_uri=self.storage_uri,
                 connection_string=azure_connection_string,
+                max_connections=self._storage_max_connections,
             )
 
         elif self.storage_provider_type == "gcp":
@@ -139,6 +293,7 @@ class SmartCloudTagger:
             self.storage_provider = GCSProvider(
                 storage_uri=self.storage_uri,
                 credentials_path=gcp_credentials_path,
+                max_connections=self._storage_max_connections,
             )
 
     def _init_llm_provider(self):
@@ -153,19 +308,31 @@ class SmartCloudTagger:
                 raise ConfigurationError(
                     "OpenAI provider not available. Install with: pip install smart_cloud_tag[openai]"
                 )
-            self.llm_provider = OpenAIProvider(
-                model=self.llm_model,
-                api_key=self.api_key,
-            )
+            if self.use_batch_api:
+                self.llm_provider = OpenAIBatchProvider(
+                    model=self.llm_model,
+                    api_key=self.api_key,
+                    max_connections=self._llm_max_connections,
+                    max_retries=self.max_retries,
+                )
+            else:
+                self.llm_provider = OpenAIProvider(
+                    model=self.llm_model,
+                    api_key=self.api_key,
+                    max_connections=self._llm_max_connections,
+                )
 
         elif self.llm_provider_type == "anthropic":
             if not ANTHROPIC_AVAILABLE:
                 raise ConfigurationError(
                     "Anthropic provider not available. Install with: pip install smart_cloud_tag[anthropic]"
                 )
+            from .llm.anthropic_provider import AnthropicProvider
+
             self.llm_provider = AnthropicProvider(
                 model=self.llm_model,
                 api_key=self.api_key,
+                max_connections=self._llm_max_connections,
             )
 
         elif self.llm_provider_type == "gemini":
@@ -173,117 +340,562 @@ class SmartCloudTagger:
                 raise ConfigurationError(
                     "Gemini provider not available. Install with: pip install smart_cloud_tag[gemini]"
                 )
+            from .llm.gemini_provider import GeminiProvider
+
             self.llm_provider = GeminiProvider(
                 model=self.llm_model,
                 api_key=self.api_key,
             )
 
-    def preview_tags(self, max_bytes: Optional[int] = None) -> TaggingResult:
-        return self._process_objects(ProcessingMode.PREVIEW, max_bytes)
+    def close(self) -> None:
+        self.llm_provider.close()
+        self.storage_provider.close()
+        if self._response_cache is not None:
+            self._response_cache.close()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+
+    def __enter__(self) -> "SmartCloudTagger":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def preview_tags(
+        self,
+        max_bytes: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        results_path: Optional[str] = None,
+    ) -> TaggingResult:
+        return self._process_objects(
+            ProcessingMode.PREVIEW, max_bytes, progress_callback, results_path
+        )
+
+    def apply_tags(
+        self,
+        max_bytes: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        results_path: Optional[str] = None,
+    ) -> TaggingResult:
+        return self._process_objects(
+            ProcessingMode.APPLY, max_bytes, progress_callback, results_path
+        )
+
+    async def apreview_tags(
+        self,
+        max_bytes: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        results_path: Optional[str] = None,
+    ) -> TaggingResult:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.preview_tags, max_bytes, progress_callback, results_path
+        )
 
-    def apply_tags(self, max_bytes: Optional[int] = None) -> TaggingResult:
-        return self._process_objects(ProcessingMode.APPLY, max_bytes)
+    async def aapply_tags(
+        self,
+        max_bytes: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        results_path: Optional[str] = None,
+    ) -> TaggingResult:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.apply_tags, max_bytes, progress_callback, results_path
+        )
 
     def _process_objects(
         self,
         mode: ProcessingMode,
         max_bytes: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        results_path: Optional[str] = None,
     ) -> TaggingResult:
         process_max_bytes = max_bytes or self.config.max_bytes
         result = TaggingResult(mode=mode, config=self.config, results={}, summary={})
 
         try:
-            objects = list(self.storage_provider.list_objects())
+            batching_client = None
+            generate_tags = with_retries(
+                self.llm_provider.generate_tags, self._rate_limiter, self.max_retries
+            )
+            if self.llm_batch_size:
+                batching_client = BatchingLLMClient(
+                    with_batch_retries(
+                        self.llm_provider.generate_tags_batch,
+                        self._rate_limiter,
+                        self.max_retries,
+                    ),
+                    batch_size=self.llm_batch_size,
+                    max_wait_ms=self.llm_batch_wait_ms,
+                )
+                generate_tags = batching_client.generate_tags
+
+            if self._response_cache is not None:
+                generate_tags = self._cached(generate_tags)
+
+            if self.dedupe_content:
+                generate_tags = self._deduplicated(generate_tags)
+
+            max_in_flight = self.max_workers * IN_FLIGHT_OBJECTS_PER_WORKER
+            listed = 0
+            results_file = None
+
+            def listed_objects() -> Iterator[str]:
+                nonlocal listed
+                for obj_key in prefetch(
+                    self.storage_provider.list_objects(), max_in_flight
+                ):
+                    listed += 1
+                    yield obj_key
+
+            def record(obj_key: str, object_tags: ObjectTags) -> None:
+                result.add_result(obj_key, object_tags)
+                if results_file is not None:
+                    results_file.write(
+                        f'{{"uri": {json.dumps(obj_key)}, '
+                        f'"result": {object_tags.model_dump_json()}}}\n'
+                    )
+                if progress_callback is not None:
+                    progress_callback(len(result.results), listed)
+
+            try:
+                # Results are also written out one JSON line each as they are
+                # collected, so a long run can be inspected while it progresses
+                if results_path:
+                    results_file = open(
+                        results_path,
+                        "w",
+                        encoding="utf-8",
+                        buffering=RESULTS_BUFFER_BYTES,
+                    )
+
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    if self.use_batch_api:
+                        self._run_batch_jobs(
+                            executor,
+                            listed_objects(),
+                            mode,
+                            process_max_bytes,
+                            generate_tags,
+                            record,
+                            max_in_flight,
+                        )
+                    else:
+                        self._run_streaming(
+                            executor,
+                            listed_objects(),
+                            mode,
+                            process_max_bytes,
+                            generate_tags,
+                            record,
+                            max_in_flight,
+                        )
+            finally:
+                if batching_client is not None:
+                    batching_client.close()
+                if results_file is not None:
+                    results_file.close()
 
-            if not objects:
+            if not listed:
                 result.summary = {"message": "No objects found in bucket"}
                 return result
 
-            for obj_key in objects:
-                try:
-                    if not self.storage_provider.is_supported_file_type(obj_key):
-                        result.add_result(
-                            obj_key,
-                            create_object_tags_result(
-                                existing_tags={}, skipped_reason="Unsupported file type"
-                            ),
-                        )
-                        continue
+            result.summary = result.get_summary_stats()
 
-                    existing_tags = self.storage_provider.get_object_tags(obj_key)
-                    content_bytes, file_type = self.storage_provider.get_object_content(
-                        obj_key, process_max_bytes
-                    )
+        except Exception as e:
+            raise SmartCloudTagError(f"Failed to process objects: {str(e)}")
 
-                    text_content = parse_file_content(content_bytes, file_type)
-                    truncated_content = truncate_content(
-                        text_content, process_max_bytes
-                    )
+        return result
 
-                    llm_request = LLMRequest(
-                        content=truncated_content,
-                        tags=self.config.tags,
-                        filename=obj_key,
-                        custom_prompt_template=self.custom_prompt_template,
-                    )
+    def _run_streaming(
+        self,
+        executor: ThreadPoolExecutor,
+        objects: Iterator[str],
+        mode: ProcessingMode,
+        process_max_bytes: int,
+        generate_tags: Callable[[LLMRequest], LLMResponse],
+        record: Callable[[str, ObjectTags], None],
+        max_in_flight: int,
+    ) -> None:
+        # Objects are submitted while the listing is still being paged in
+        # the background. Waiting on the oldest future keeps results in
+        # listing order and bounds how many objects are held in memory.
+        in_flight: Deque[Tuple[str, "Future[ObjectTags]"]] = deque()
+
+        def collect_oldest() -> None:
+            done_key, done_future = in_flight.popleft()
+            record(done_key, done_future.result())
+
+        for obj_key in objects:
+            future = executor.submit(
+                self._process_one, obj_key, mode, process_max_bytes, generate_tags
+            )
+            in_flight.append((obj_key, future))
 
-                    llm_response = self.llm_provider.generate_tags(llm_request)
-                    tag_keys = list(self.config.tags.keys())
-                    proposed_tags = create_tag_mapping(
-                        tag_keys, llm_response.tags, self.storage_provider_type
-                    )
+            if len(in_flight) >= max_in_flight:
+                collect_oldest()
 
-                    if mode == ProcessingMode.PREVIEW:
-                        result.add_result(
-                            obj_key,
-                            create_object_tags_result(
-                                existing_tags=existing_tags, proposed_tags=proposed_tags
-                            ),
-                        )
-                    else:
-                        try:
-                            final_tags = merge_and_validate_tags(
-                                existing_tags,
-                                proposed_tags,
-                                tag_keys,
-                                self.storage_provider_type,
-                            )
-
-                            self.storage_provider.set_object_tags(obj_key, final_tags)
-
-                            result.add_result(
-                                obj_key,
-                                create_object_tags_result(
-                                    existing_tags=existing_tags,
-                                    proposed_tags=proposed_tags,
-                                    applied_tags=final_tags,
-                                ),
-                            )
-                        except Exception as e:
-                            result.add_result(
-                                obj_key,
-                                create_object_tags_result(
-                                    existing_tags=existing_tags,
-                                    proposed_tags=proposed_tags,
-                                    skipped_reason=f"Failed to apply tags: {str(e)}",
-                                ),
-                            )
-
-                except Exception as e:
-                    result.add_result(
-                        obj_key,
-                        create_object_tags_result(
-                            existing_tags={},
-                            skipped_reason=f"Processing error: {str(e)}",
-                        ),
-                    )
+        while in_flight:
+            collect_oldest()
 
-            result.summary = result.get_summary_stats()
+    def _run_batch_jobs(
+        self,
+        executor: ThreadPoolExecutor,
+        objects: Iterator[str],
+        mode: ProcessingMode,
+        process_max_bytes: int,
+        generate_tags: Callable[[LLMRequest], LLMResponse],
+        record: Callable[[str, ObjectTags], None],
+        max_in_flight: int,
+    ) -> None:
+        # Objects are prepared by the workers while the listing continues, and
+        # every request the cache cannot answer is collected into OpenAI Batch
+        # API jobs of up to BATCH_API_MAX_REQUESTS. All jobs are submitted
+        # before the first one is waited on, so they run side by side. Requests
+        # a job could not complete fall back to generate_tags, and results are
+        # still recorded in listing order.
+        cache = self._response_cache
+        entries: Deque[Tuple[str, "Future[ObjectTags]"]] = deque()
+        preparing: Deque[Tuple[str, "Future[ObjectTags]", "Future[Prepared]"]] = deque()
+        jobs: List[Tuple["Future[str]", float, List[BatchSlot]]] = []
+        chunk: List[BatchSlot] = []
+        chunk_bytes = 0
+        slots_by_content: Dict[bytes, BatchSlot] = {}
+
+        def finish(slot: BatchSlot, llm_response: Optional[LLMResponse]) -> None:
+            llm_request, _, waiting = slot
+            for pending in waiting:
+                executor.submit(
+                    self._finish_pending,
+                    pending,
+                    mode,
+                    llm_request,
+                    llm_response,
+                    generate_tags,
+                )
+
+        def submit_chunk() -> None:
+            nonlocal chunk, chunk_bytes
+            requests = [llm_request for llm_request, _, _ in chunk]
+            deadline = time.monotonic() + self.batch_api_timeout
+            jobs.append(
+                (
+                    executor.submit(self.llm_provider.submit_batch, requests),
+                    deadline,
+                    chunk,
+                )
+            )
+            chunk, chunk_bytes = [], 0
+
+        def take_prepared() -> None:
+            nonlocal chunk_bytes
+            obj_key, future, prepare_future = preparing.popleft()
+            prepared = prepare_future.result()
+            if isinstance(prepared, ObjectTags):
+                future.set_result(prepared)
+                return
+
+            existing_tags, llm_request, fingerprint = prepared
+            pending = (future, obj_key, existing_tags, fingerprint)
+            cache_key = None
+            if cache is not None:
+                cache_key = self._cache_key(llm_request)
+                cached_response = cache.get(cache_key)
+                if cached_response is not None:
+                    finish((llm_request, None, [pending]), cached_response)
+                    return
+
+            digest = None
+            if self.dedupe_content:
+                digest = self._content_digest(llm_request)
+                slot = slots_by_content.get(digest)
+                if slot is not None:
+                    slot[2].append(pending)
+                    return
+
+            slot = (llm_request, cache_key, [pending])
+            if digest is not None:
+                slots_by_content[digest] = slot
+            chunk.append(slot)
+            chunk_bytes += len(llm_request.prompt or "")
+            if (
+                len(chunk) >= BATCH_API_MAX_REQUESTS
+                or chunk_bytes >= BATCH_API_MAX_PROMPT_BYTES
+            ):
+                submit_chunk()
+
+        def record_done() -> None:
+            while entries and entries[0][1].done():
+                obj_key, future = entries.popleft()
+                record(obj_key, future.result())
+
+        for obj_key in objects:
+            future: "Future[ObjectTags]" = Future()
+            entries.append((obj_key, future))
+            preparing.append(
+                (
+                    obj_key,
+                    future,
+                    executor.submit(self._prepare_or_skip, obj_key, process_max_bytes),
+                )
+            )
+            if len(preparing) >= max_in_flight:
+                take_prepared()
+                record_done()
+
+        while preparing:
+            take_prepared()
+        if chunk:
+            submit_chunk()
+        record_done()
+
+        for submitted, deadline, slots in jobs:
+            try:
+                llm_responses = self.llm_provider.collect_batch(
+                    submitted.result(),
+                    [llm_request for llm_request, _, _ in slots],
+                    deadline,
+                )
+            except Exception as e:
+                failed = self._processing_error(e)
+                for _, _, waiting in slots:
+                    for pending in waiting:
+                        pending[0].set_result(failed)
+                continue
+
+            for slot, llm_response in zip(slots, llm_responses):
+                if llm_response is not None and slot[1] is not None:
+                    cache.set(slot[1], llm_response)
+                finish(slot, llm_response)
+            record_done()
+
+        while entries:
+            obj_key, future = entries.popleft()
+            record(obj_key, future.result())
+
+    def _finish_pending(
+        self,
+        pending: PendingObject,
+        mode: ProcessingMode,
+        llm_request: LLMRequest,
+        llm_response: Optional[LLMResponse],
+        generate_tags: Callable[[LLMRequest], LLMResponse],
+    ) -> None:
+        future, obj_key, existing_tags, fingerprint = pending
+        try:
+            if llm_response is None:
+                llm_response = generate_tags(llm_request)
+            object_tags = self._finish_object(
+                obj_key, mode, existing_tags, llm_response, fingerprint
+            )
+        except Exception as e:
+            object_tags = self._processing_error(e)
+        future.set_result(object_tags)
 
+    def _prepare_or_skip(self, obj_key: str, process_max_bytes: int) -> Prepared:
+        try:
+            return self._prepare_object(obj_key, process_max_bytes)
         except Exception as e:
-            raise SmartCloudTagError(f"Failed to process objects: {str(e)}")
+            return self._processing_error(e)
 
-        return result
+    @staticmethod
+    def _processing_error(error: Exception) -> ObjectTags:
+        return create_object_tags_result(
+            existing_tags={},
+            skipped_reason=f"Processing error: {str(error)}",
+        )
+
+    def _process_one(
+        self,
+        obj_key: str,
+        mode: ProcessingMode,
+        process_max_bytes: int,
+        generate_tags: Callable[[LLMRequest], LLMResponse],
+    ) -> ObjectTags:
+        try:
+            prepared = self._prepare_object(obj_key, process_max_bytes)
+            if isinstance(prepared, ObjectTags):
+                return prepared
+
+            existing_tags, llm_request, fingerprint = prepared
+            llm_response = generate_tags(llm_request)
+            return self._finish_object(
+                obj_key, mode, existing_tags, llm_response, fingerprint
+            )
+
+        except Exception as e:
+            return self._processing_error(e)
+
+    def _cache_key(self, llm_request: LLMRequest) -> str:
+        model = f"{self.llm_provider_type}:{self.llm_model}"
+        return self._response_cache.make_key(model, llm_request)
+
+    @staticmethod
+    def _content_digest(llm_request: LLMRequest) -> bytes:
+        return hashlib.blake2b(
+            llm_request.content.encode("utf-8"), digest_size=16
+        ).digest()
+
+    def _cached(
+        self, generate_tags: Callable[[LLMRequest], LLMResponse]
+    ) -> Callable[[LLMRequest], LLMResponse]:
+        cache = self._response_cache
+
+        def generate(llm_request: LLMRequest) -> LLMResponse:
+            key = self._cache_key(llm_request)
+            cached_response = cache.get(key)
+            if cached_response is not None:
+                return cached_response
+
+            llm_response = generate_tags(llm_request)
+            cache.set(key, llm_response)
+            return llm_response
+
+        return generate
+
+    def _deduplicated(
+        self, generate_tags: Callable[[LLMRequest], LLMResponse]
+    ) -> Callable[[LLMRequest], LLMResponse]:
+        # Objects of a run with identical content share one LLM call, even
+        # when their names differ. Duplicates that arrive while the first call
+        # is still running wait for its response.
+        responses: Dict[bytes, "Future[LLMResponse]"] = {}
+        lock = threading.Lock()
+
+        def generate(llm_request: LLMRequest) -> LLMResponse:
+            key = self._content_digest(llm_request)
+            with lock:
+                future = responses.get(key)
+                if future is None:
+                    future = responses[key] = Future()
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                return future.result()
+
+            try:
+                llm_response = generate_tags(llm_request)
+            except Exception as e:
+                # Later duplicates make their own attempt
+                with lock:
+                    del responses[key]
+                future.set_exception(e)
+                raise
+
+            future.set_result(llm_response)
+            return llm_response
+
+        return generate
+
+    def _prepare_object(self, obj_key: str, process_max_bytes: int) -> Prepared:
+        if not self.storage_provider.is_supported_file_type(obj_key):
+            return create_object_tags_result(
+                existing_tags={}, skipped_reason="Unsupported file type"
+            )
+
+        fingerprint = None
+        if self.skip_fully_tagged or self.track_changes:
+            existing_tags = self.storage_provider.get_object_tags(obj_key)
+            if self.skip_fully_tagged and is_fully_tagged(
+                existing_tags, self.config.tags
+            ):
+                return create_object_tags_result(
+                    existing_tags=existing_tags, skipped_reason="Already fully tagged"
+                )
+
+            if self.track_changes:
+                version = self.storage_provider.get_object_version(obj_key)
+                if version is not None:
+                    fingerprint = object_fingerprint(self.config.tags, version)
+                    if existing_tags.get(FINGERPRINT_TAG_KEY) == fingerprint:
+                        return create_object_tags_result(
+                            existing_tags=existing_tags,
+                            skipped_reason="Unchanged since last run",
+                        )
+
+            content_bytes, file_type = self.storage_provider.get_object_content(
+                obj_key, process_max_bytes, self.download_concurrency
+            )
+        else:
+            # The tags do not decide whether the content is needed, so the
+            # provider can fetch both together
+            content_bytes, file_type, existing_tags = (
+                self.storage_provider.get_object_content_and_tags(
+                    obj_key, process_max_bytes, self.download_concurrency
+                )
+            )
+
+        if file_type in PLAIN_TEXT_FILE_TYPES:
+            truncated_content = decode_text_content(content_bytes, process_max_bytes)
+        else:
+            if self._parse_pool is not None:
+                text_content = self._parse_pool.submit(
+                    parse_file_content, content_bytes, file_type, process_max_bytes
+                ).result()
+            else:
+                text_content = parse_file_content(
+                    content_bytes, file_type, process_max_bytes
+                )
+            truncated_content = truncate_content(text_content, process_max_bytes)
+
+        # The tag config was validated once in __init__, so the per-object
+        # request is built without re-validating and copying it
+        llm_request = LLMRequest.model_construct(
+            content=truncated_content,
+            tags=self.config.tags,
+            filename=obj_key,
+            custom_prompt_template=self.custom_prompt_template,
+            prompt=render_llm_prompt(self._compiled_prompt, truncated_content, obj_key),
+        )
+
+        return existing_tags, llm_request, fingerprint
+
+    def _finish_object(
+        self,
+        obj_key: str,
+        mode: ProcessingMode,
+        existing_tags: Dict[str, str],
+        llm_response: LLMResponse,
+        fingerprint: Optional[str] = None,
+    ) -> ObjectTags:
+        proposed_tags = create_tag_mapping(
+            self._tag_keys, llm_response.tags, self.storage_provider_type
+        )
+
+        if mode == ProcessingMode.PREVIEW:
+            return create_object_tags_result(
+                existing_tags=existing_tags, proposed_tags=proposed_tags
+            )
+
+        try:
+            tags_to_keep = existing_tags
+            if fingerprint is not None:
+                tags_to_keep = {**existing_tags, FINGERPRINT_TAG_KEY: fingerprint}
+
+            final_tags = merge_and_validate_tags(
+                tags_to_keep,
+                proposed_tags,
+                self._tag_keys,
+                self.storage_provider_type,
+            )
+
+            # Re-runs often propose exactly the tags an object already has
+            if final_tags != existing_tags:
+                self.storage_provider.set_object_tags(obj_key, final_tags)
+
+            return create_object_tags_result(
+                existing_tags=existing_tags,
+                proposed_tags=proposed_tags,
+                applied_tags=final_tags,
+            )
+        except Exception as e:
+            return create_object_tags_result(
+                existing_tags=existing_tags,
+                proposed_tags=proposed_tags,
+                skipped_reason=f"Failed to apply tags: {str(e)}",
+            )
 
     def get_storage_info(self) -> Dict[str, str]:
         return {
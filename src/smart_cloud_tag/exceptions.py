@@ -20,3 +20,7 @@ class ConfigurationError(SmartCloudTagError):
 
 class FileProcessingError(SmartCloudTagError):
     pass
+
+
+class LLMTransientError(LLMError):
+    pass
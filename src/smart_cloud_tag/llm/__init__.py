@@ -1,21 +1,42 @@
+from importlib import import_module
+from importlib.util import find_spec
+
 from .base import LLMProvider
+from .batching import BatchingLLMClient
+
+
+def _module_available(name: str) -> bool:
+    try:
+        return find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Provider SDKs are only imported once their provider is used
+OPENAI_AVAILABLE = _module_available("openai")
+ANTHROPIC_AVAILABLE = _module_available("anthropic")
+GEMINI_AVAILABLE = _module_available("google.generativeai")
+
+_PROVIDER_MODULES = {
+    "OpenAIProvider": ".openai_provider",
+    "OpenAIBatchProvider": ".openai_provider",
+    "AnthropicProvider": ".anthropic_provider",
+    "GeminiProvider": ".gemini_provider",
+}
+
+
+def __getattr__(name: str):
+    if name in _PROVIDER_MODULES:
+        module = import_module(_PROVIDER_MODULES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-try:
-    from .openai_provider import OpenAIProvider
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-try:
-    from .anthropic_provider import AnthropicProvider
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-
-try:
-    from .gemini_provider import GeminiProvider
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-
-__all__ = ["LLMProvider", "OpenAIProvider", "AnthropicProvider", "GeminiProvider"]
\ No newline at end of file
+__all__ = [
+    "LLMProvider",
+    "BatchingLLMClient",
+    "OpenAIProvider",
+    "OpenAIBatchProvider",
+    "AnthropicProvider",
+    "GeminiProvider",
+]
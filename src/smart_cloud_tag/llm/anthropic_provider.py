@@ -1,21 +1,42 @@
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
 
 try:
     import anthropic
 
     ANTHROPIC_AVAILABLE = True
+    TRANSIENT_ERRORS = (
+        anthropic.RateLimitError,
+        anthropic.APIConnectionError,
+        anthropic.InternalServerError,
+    )
 except ImportError:
     ANTHROPIC_AVAILABLE = False
     anthropic = None
+    TRANSIENT_ERRORS = ()
 
-from ..exceptions import LLMError
+from ..config import DEFAULT_LLM_CONCURRENCY, DEFAULT_MAX_CONNECTIONS
+from ..exceptions import LLMError, LLMTransientError
 from ..models import LLMRequest, LLMResponse
-from ..utils import format_llm_prompt, format_custom_llm_prompt
-from .base import LLMProvider
+from ..utils import (
+    build_tag_response_schema,
+    parse_llm_response,
+    parse_structured_llm_response,
+)
+from .base import BatchOutcome, LLMProvider
+
+MAX_TOKENS = 1024
+TAG_TOOL_NAME = "assign_tags"
 
 
 class AnthropicProvider(LLMProvider):
-    def __init__(self, model: str, api_key: str):
+    def __init__(
+        self,
+        model: str,
+        api_key: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        concurrency: int = DEFAULT_LLM_CONCURRENCY,
+    ):
         if not ANTHROPIC_AVAILABLE:
             raise LLMError(
                 "Anthropic not available. Install with: pip install smart_cloud_tag[anthropic]"
@@ -23,46 +44,78 @@ class AnthropicProvider(LLMProvider):
 
         self.model = model
         self.api_key = api_key
+        self.concurrency = concurrency
+        max_connections = max(max_connections, concurrency)
 
         try:
-            self.client = anthropic.Anthropic(api_key=api_key)
+            import httpx
+
+            self.client = anthropic.Anthropic(
+                api_key=api_key,
+                http_client=anthropic.DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=max_connections,
+                        max_keepalive_connections=max_connections,
+                    )
+                ),
+            )
         except Exception as e:
             raise LLMError(f"Failed to initialize Anthropic client: {str(e)}")
 
-    def generate_tags(self, request: LLMRequest) -> LLMResponse:
-        try:
-            if request.custom_prompt_template:
-                prompt = format_custom_llm_prompt(
-                    request.custom_prompt_template,
-                    request.tags,
-                    request.content,
-                    request.filename,
+        # Shared by all batches so that at most `concurrency` calls are in flight
+        self._batch_executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def _message_params(self, request: LLMRequest) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS,
+            "temperature": 0.1,
+            "messages": [{"role": "user", "content": self.build_prompt(request)}],
+            "tools": [
+                {
+                    "name": TAG_TOOL_NAME,
+                    "description": "Assign a value to every tag key",
+                    "input_schema": build_tag_response_schema(request.tags),
+                }
+            ],
+            "tool_choice": {"type": "tool", "name": TAG_TOOL_NAME},
+        }
+
+    def _parse_message(self, message: Any, request: LLMRequest) -> LLMResponse:
+        tag_keys = list(request.tags.keys())
+
+        for block in message.content or []:
+            if block.type == "tool_use" and block.name == TAG_TOOL_NAME:
+                return LLMResponse.model_construct(
+                    tags=parse_structured_llm_response(block.input, tag_keys)
                 )
-            else:
-                prompt = format_llm_prompt(
-                    request.tags, request.content, request.filename
-                )
-
-            response = self.client.messages.create(
-                model=self.model,
-                temperature=0.1,
-                messages=[{"role": "user", "content": prompt}],
-            )
 
-            content = response.content[0].text if response.content else ""
+        content = "".join(
+            block.text for block in message.content or [] if block.type == "text"
+        )
+        return LLMResponse.model_construct(tags=parse_llm_response(content, tag_keys))
 
-            from ..utils import parse_llm_response
-
-            tag_keys = list(request.tags.keys())
-            tags = parse_llm_response(content, tag_keys)
-
-            return LLMResponse(tags=tags)
+    def generate_tags(self, request: LLMRequest) -> LLMResponse:
+        try:
+            response = self.client.messages.create(**self._message_params(request))
+            return self._parse_message(response, request)
 
+        except TRANSIENT_ERRORS as e:
+            raise LLMTransientError(f"Anthropic API error: {str(e)}")
         except Exception as e:
             raise LLMError(f"Failed to generate tags with Anthropic: {str(e)}")
 
+    def generate_tags_batch(self, requests: List[LLMRequest]) -> List[BatchOutcome]:
+        if len(requests) <= 1:
+            return super().generate_tags_batch(requests)
+        return list(self._batch_executor.map(self._generate_or_error, requests))
+
     def is_available(self) -> bool:
         return ANTHROPIC_AVAILABLE
 
+    def close(self) -> None:
+        self._batch_executor.shutdown()
+        self.client.close()
+
     def get_model_name(self) -> str:
         return self.model
@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
+from typing import List, Union
 from ..models import LLMRequest, LLMResponse
+from ..utils import get_compiled_llm_prompt, render_llm_prompt
+
+# The response to one request of a batch, or the exception it failed with, so
+# that one failed request does not fail the rest of its batch
+BatchOutcome = Union[LLMResponse, Exception]
 
 
 class LLMProvider(ABC):
@@ -7,6 +13,30 @@ class LLMProvider(ABC):
     def generate_tags(self, request: LLMRequest) -> LLMResponse:
         pass
 
+    def build_prompt(self, request: LLMRequest) -> str:
+        if request.prompt is not None:
+            return request.prompt
+
+        if not request.custom_prompt_template and not request.filename.strip():
+            raise ValueError("filename is required and cannot be empty")
+
+        # Requests built outside SmartCloudTagger carry no rendered prompt, so
+        # the template is compiled once per tag set and reused across calls
+        compiled = get_compiled_llm_prompt(request.tags, request.custom_prompt_template)
+        return render_llm_prompt(compiled, request.content, request.filename)
+
+    def generate_tags_batch(self, requests: List[LLMRequest]) -> List[BatchOutcome]:
+        return [self._generate_or_error(request) for request in requests]
+
+    def _generate_or_error(self, request: LLMRequest) -> BatchOutcome:
+        try:
+            return self.generate_tags(request)
+        except Exception as e:
+            return e
+
+    def close(self) -> None:
+        pass
+
     @abstractmethod
     def is_available(self) -> bool:
         pass
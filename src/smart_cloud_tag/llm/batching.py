@@ -0,0 +1,140 @@
+import statistics
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from ..exceptions import LLMError
+from ..models import LLMRequest, LLMResponse
+from .base import BatchOutcome
+
+BatchFunction = Callable[[List[LLMRequest]], List[BatchOutcome]]
+
+# Request, the future resolved with its response, and its enqueue time
+PendingRequest = Tuple[LLMRequest, "Future[LLMResponse]", float]
+
+# Number of recent prompt lengths used to place the bucket boundaries
+LENGTH_WINDOW = 1024
+# Bucket boundaries are recomputed every this many submissions
+LENGTH_REFRESH_INTERVAL = 32
+
+
+# Collects single requests from many threads into provider batches. Requests
+# are bucketed by content length so that short prompts are not held back by
+# long ones. A bucket is flushed once batch_size requests are waiting in it or
+# its oldest one has waited max_wait_ms.
+class BatchingLLMClient:
+    def __init__(
+        self,
+        generate_batch: BatchFunction,
+        batch_size: int = 16,
+        max_wait_ms: int = 50,
+        max_concurrent_batches: int = 4,
+        num_buckets: int = 4,
+    ):
+        self.generate_batch = generate_batch
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.num_buckets = num_buckets
+
+        self._buffers: Dict[int, List[PendingRequest]] = {}
+        self._lengths: Deque[int] = deque(maxlen=LENGTH_WINDOW)
+        self._length_cuts: List[float] = []
+        self._submitted = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flush_pool = ThreadPoolExecutor(max_workers=max_concurrent_batches)
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, request: LLMRequest) -> "Future[LLMResponse]":
+        future: "Future[LLMResponse]" = Future()
+        with self._condition:
+            if self._closed:
+                raise LLMError("Batching client is closed")
+            bucket = self._bucket_for(len(request.content))
+            self._buffers.setdefault(bucket, []).append(
+                (request, future, time.monotonic())
+            )
+            self._condition.notify()
+        return future
+
+    def generate_tags(self, request: LLMRequest) -> LLMResponse:
+        return self.submit(request).result()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._dispatcher.join()
+        self._flush_pool.shutdown(wait=True)
+
+    def _dispatch(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._flush_pool.submit(self._flush, batch)
+
+    def _bucket_for(self, length: int) -> int:
+        self._lengths.append(length)
+        self._submitted += 1
+        if (
+            self._submitted <= LENGTH_REFRESH_INTERVAL
+            or self._submitted % LENGTH_REFRESH_INTERVAL == 0
+        ) and len(self._lengths) >= 2:
+            self._length_cuts = statistics.quantiles(self._lengths, n=self.num_buckets)
+        return bisect_left(self._length_cuts, length)
+
+    def _next_batch(self) -> Optional[List[PendingRequest]]:
+        with self._condition:
+            while True:
+                ready = self._ready_bucket()
+                if ready is not None:
+                    buffer = self._buffers[ready]
+                    batch = buffer[: self.batch_size]
+                    del buffer[: self.batch_size]
+                    if not buffer:
+                        del self._buffers[ready]
+                    return batch
+
+                if not self._buffers:
+                    if self._closed:
+                        return None
+                    self._condition.wait()
+                    continue
+
+                oldest = min(buffer[0][2] for buffer in self._buffers.values())
+                self._condition.wait(oldest + self.max_wait - time.monotonic())
+
+    def _ready_bucket(self) -> Optional[int]:
+        now = time.monotonic()
+        expired = None
+        for bucket, buffer in self._buffers.items():
+            if len(buffer) >= self.batch_size:
+                return bucket
+            if expired is None and (
+                self._closed or buffer[0][2] + self.max_wait <= now
+            ):
+                expired = bucket
+        return expired
+
+    def _flush(self, batch: List[PendingRequest]) -> None:
+        try:
+            responses = self.generate_batch([request for request, _, _ in batch])
+            if len(responses) != len(batch):
+                raise LLMError(
+                    f"Expected {len(batch)} batch responses, got {len(responses)}"
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), response in zip(batch, responses):
+            if isinstance(response, BaseException):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
@@ -1,19 +1,60 @@
-from typing import Dict, List, Optional
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions
 
     GEMINI_AVAILABLE = True
+    TRANSIENT_ERRORS = (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+    )
 except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
+    TRANSIENT_ERRORS = ()
 
-from ..exceptions import LLMError
+from ..exceptions import LLMError, LLMTransientError
 from ..models import LLMRequest, LLMResponse
-from ..utils import format_llm_prompt, format_custom_llm_prompt
+from ..utils import (
+    build_tag_response_schema,
+    parse_structured_llm_response,
+    tags_cache_key,
+)
 from .base import LLMProvider
 
 
+def _to_gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    # Gemini expects upper-case type names and an explicit enum format
+    properties = {}
+    for key, prop in schema["properties"].items():
+        properties[key] = {"type": prop["type"].upper()}
+        if "enum" in prop:
+            properties[key].update(format="enum", enum=prop["enum"])
+
+    return {
+        "type": schema["type"].upper(),
+        "properties": properties,
+        "required": schema["required"],
+    }
+
+
+@lru_cache(maxsize=64)
+def _gemini_response_schema(
+    tags_key: Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...],
+) -> Dict[str, Any]:
+    return _to_gemini_schema(build_tag_response_schema(dict(tags_key)))
+
+
+def gemini_response_schema(tags: Dict[str, Optional[List[str]]]) -> Dict[str, Any]:
+    # Cached per tag schema and shared between calls, so callers must not mutate it
+    return _gemini_response_schema(tags_cache_key(tags))
+
+
 class GeminiProvider(LLMProvider):
     def __init__(self, model: str, api_key: str):
         if not GEMINI_AVAILABLE:
@@ -32,34 +73,26 @@ class GeminiProvider(LLMProvider):
 
     def generate_tags(self, request: LLMRequest) -> LLMResponse:
         try:
-            if request.custom_prompt_template:
-                prompt = format_custom_llm_prompt(
-                    request.custom_prompt_template,
-                    request.tags,
-                    request.content,
-                    request.filename,
-                )
-            else:
-                prompt = format_llm_prompt(
-                    request.tags, request.content, request.filename
-                )
+            prompt = self.build_prompt(request)
 
             response = self.model_instance.generate_content(
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.1,
+                    response_mime_type="application/json",
+                    response_schema=gemini_response_schema(request.tags),
                 ),
             )
 
-            content = response.text if response.text else ""
-
-            from ..utils import parse_llm_response
+            content = response.text if response.text else "{}"
 
             tag_keys = list(request.tags.keys())
-            tags = parse_llm_response(content, tag_keys)
+            tags = parse_structured_llm_response(json.loads(content), tag_keys)
 
-            return LLMResponse(tags=tags)
+            return LLMResponse.model_construct(tags=tags)
 
+        except TRANSIENT_ERRORS as e:
+            raise LLMTransientError(f"Gemini API error: {str(e)}")
         except Exception as e:
             raise LLMError(f"Failed to generate tags with Gemini: {str(e)}")
 
@@ -1,81 +1,163 @@
+import json
 import os
+import time
 import openai
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from openai import OpenAI
 from openai.types.chat import ChatCompletion
 
-from .base import LLMProvider
+from .base import BatchOutcome, LLMProvider
+from ..config import (
+    BATCH_CANCEL_GRACE_SECONDS,
+    DEFAULT_BATCH_POLL_SECONDS,
+    DEFAULT_LLM_CONCURRENCY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_RETRIES,
+)
 from ..models import LLMRequest, LLMResponse
-from ..utils import format_llm_prompt, format_custom_llm_prompt, parse_llm_response
-from ..exceptions import LLMError
+from ..utils import build_tag_response_schema, parse_structured_llm_response
+from ..exceptions import LLMError, LLMTransientError
+from ..retry import with_retries
+
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a helpful assistant that generates semantic tags for documents.",
+}
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+# Expired and cancelled jobs still return the requests they completed
+BATCH_DONE_STATUSES = frozenset({"completed", "expired", "cancelled"})
+
+
+def read_streamed_json(chunks: Iterable[Any]) -> Optional[Any]:
+    # Stops at the first point the streamed text decodes as a complete JSON
+    # value instead of waiting for the trailing chunks
+    parts: List[str] = []
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        parts.append(delta)
+        if "}" in delta:
+            try:
+                return json.loads("".join(parts))
+            except ValueError:
+                pass
+
+    text = "".join(parts)
+    return json.loads(text) if text else None
 
 
 class OpenAIProvider(LLMProvider):
-    def __init__(self, model: str, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        concurrency: int = DEFAULT_LLM_CONCURRENCY,
+    ):
         self.model = model
         self.api_key = api_key
+        self.concurrency = concurrency
 
         if not self.api_key:
             raise LLMError(
                 "OpenAI API key not provided and OPENAI_API_KEY environment variable not set"
             )
 
+        # Every parallel batch call needs its own keep-alive connection,
+        # otherwise calls queue in httpx waiting for the pool
+        max_connections = max(max_connections, concurrency)
+
         try:
-            self.client = OpenAI(api_key=self.api_key)
-            self.client.models.list()
+            import httpx
+
+            self.client = OpenAI(
+                api_key=self.api_key,
+                http_client=openai.DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=max_connections,
+                        max_keepalive_connections=max_connections,
+                    )
+                ),
+            )
 
         except Exception as e:
             raise LLMError(f"Failed to initialize OpenAI client: {str(e)}")
 
-    def generate_tags(self, request: LLMRequest) -> LLMResponse:
-        try:
-            if request.custom_prompt_template:
-                prompt = format_custom_llm_prompt(
-                    request.custom_prompt_template,
-                    request.tags,
-                    request.content,
-                    request.filename,
-                )
-            else:
-                prompt = format_llm_prompt(
-                    request.tags, request.content, request.filename
-                )
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that generates semantic tags for documents.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.1,
-                top_p=0.9,
-            )
+        # Shared by all batches so that at most `concurrency` calls are in flight
+        self._batch_executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def _completion_params(self, request: LLMRequest) -> Dict[str, Any]:
+        prompt = self.build_prompt(request)
+        return {
+            "model": self.model,
+            "messages": [SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            "temperature": 0.1,
+            "top_p": 0.9,
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "tags",
+                    "schema": build_tag_response_schema(request.tags),
+                    "strict": True,
+                },
+            },
+        }
+
+    def _build_response(self, data: Any, request: LLMRequest) -> LLMResponse:
+        if not data:
+            raise LLMError("Empty response from OpenAI")
 
-            content = response.choices[0].message.content
-            if not content:
-                raise LLMError("Empty response from OpenAI")
+        tag_keys = list(request.tags.keys())
+        tag_values = parse_structured_llm_response(data, tag_keys)
 
-            tag_keys = list(request.tags.keys())
-            tag_values = parse_llm_response(content, tag_keys)
+        # The parsers only return lists of strings, so there is nothing
+        # left for validation to check
+        return LLMResponse.model_construct(
+            tags=tag_values,
+            confidence=None,
+            reasoning=None,
+        )
 
-            return LLMResponse(
-                tags=tag_values,
-                confidence=None,
-                reasoning=None,
+    def generate_tags(self, request: LLMRequest) -> LLMResponse:
+        try:
+            stream = self.client.chat.completions.create(
+                **self._completion_params(request), stream=True
             )
+            with stream:
+                data = read_streamed_json(stream)
+
+            return self._build_response(data, request)
 
         except openai.RateLimitError:
-            raise LLMError("OpenAI rate limit exceeded. Please try again later.")
+            raise LLMTransientError(
+                "OpenAI rate limit exceeded. Please try again later."
+            )
         except openai.AuthenticationError:
             raise LLMError("OpenAI authentication failed. Please check your API key.")
+        except (
+            openai.APIConnectionError,
+            openai.InternalServerError,
+        ) as e:
+            raise LLMTransientError(f"OpenAI API error: {str(e)}")
         except openai.APIError as e:
             raise LLMError(f"OpenAI API error: {str(e)}")
         except Exception as e:
             raise LLMError(f"Unexpected error calling OpenAI: {str(e)}")
 
+    def generate_tags_batch(self, requests: List[LLMRequest]) -> List[BatchOutcome]:
+        if len(requests) <= 1:
+            return super().generate_tags_batch(requests)
+        return list(self._batch_executor.map(self._generate_or_error, requests))
+
+    def close(self) -> None:
+        self._batch_executor.shutdown()
+        self.client.close()
+
     def get_model_name(self) -> str:
         return self.model
 
@@ -85,3 +167,132 @@ class OpenAIProvider(LLMProvider):
             return True
         except Exception:
             return False
+
+
+class OpenAIBatchProvider(OpenAIProvider):
+    # Adds bulk jobs on the Batch API, which is billed at half the real-time
+    # price but only guarantees results within 24 hours. generate_tags and
+    # generate_tags_batch stay real time, for the requests a job could not
+    # complete.
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        concurrency: int = DEFAULT_LLM_CONCURRENCY,
+        poll_interval: float = DEFAULT_BATCH_POLL_SECONDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ):
+        super().__init__(model, api_key, max_connections, concurrency)
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries
+
+    def submit_batch(self, requests: List[LLMRequest]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": str(index),
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": self._completion_params(request),
+                },
+                ensure_ascii=False,
+            )
+            for index, request in enumerate(requests)
+        ]
+        payload = "\n".join(lines).encode("utf-8")
+
+        # Each step is retried on its own, so a failed job creation does not
+        # upload the input file again
+        input_file = self._with_retries(
+            lambda data: self.client.files.create(
+                file=("requests.jsonl", data), purpose="batch"
+            )
+        )(payload)
+        batch = self._with_retries(
+            lambda file_id: self.client.batches.create(
+                input_file_id=file_id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h",
+            )
+        )(input_file.id)
+        return batch.id
+
+    def collect_batch(
+        self, batch_id: str, requests: List[LLMRequest], deadline: float
+    ) -> List[Optional[LLMResponse]]:
+        # Waits until the job ends or the monotonic deadline passes. A late
+        # job is cancelled, which keeps the requests it already completed.
+        # Requests the job could not complete are returned as None.
+        retrieve = self._with_retries(self.client.batches.retrieve)
+        batch = retrieve(batch_id)
+        wait_until = deadline
+        cancelled = False
+        while batch.status not in BATCH_DONE_STATUSES:
+            if batch.status == "failed":
+                raise LLMError(f"OpenAI batch {batch_id} failed")
+            remaining = wait_until - time.monotonic()
+            if remaining <= 0:
+                if cancelled:
+                    # Still cancelling, so its output cannot be read yet
+                    return [None] * len(requests)
+                self._cancel_batch(batch_id)
+                cancelled = True
+                remaining = BATCH_CANCEL_GRACE_SECONDS
+                wait_until = time.monotonic() + remaining
+            time.sleep(min(self.poll_interval, remaining))
+            batch = retrieve(batch_id)
+
+        outputs: Dict[str, str] = {}
+        if batch.output_file_id:
+            download = self._with_retries(self.client.files.content)
+            outputs = parse_batch_output(download(batch.output_file_id).text)
+
+        responses: List[Optional[LLMResponse]] = []
+        for index, request in enumerate(requests):
+            content = outputs.get(str(index))
+            response = None
+            if content is not None:
+                try:
+                    response = self._build_response(json.loads(content), request)
+                except (ValueError, LLMError):
+                    pass
+            responses.append(response)
+        return responses
+
+    def _cancel_batch(self, batch_id: str) -> None:
+        try:
+            self.client.batches.cancel(batch_id)
+        except openai.APIError:
+            pass
+
+    def _with_retries(self, call: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        def translated(arg: Any) -> Any:
+            try:
+                return call(arg)
+            except (
+                openai.RateLimitError,
+                openai.APIConnectionError,
+                openai.InternalServerError,
+            ) as e:
+                raise LLMTransientError(f"OpenAI Batch API error: {str(e)}")
+            except openai.APIError as e:
+                raise LLMError(f"OpenAI Batch API error: {str(e)}")
+
+        return with_retries(translated, max_retries=self.max_retries)
+
+
+def parse_batch_output(text: str) -> Dict[str, str]:
+    # Maps the custom_id of every successful line to its message content
+    outputs = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        choices = response.get("body", {}).get("choices") or []
+        if choices and choices[0].get("message", {}).get("content"):
+            outputs[record["custom_id"]] = choices[0]["message"]["content"]
+    return outputs
@@ -1,7 +1,9 @@
 from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 from enum import Enum
 
+from .config import MAX_TAG_KEYS
+
 
 class ProcessingMode(str, Enum):
     PREVIEW = "preview"
@@ -28,8 +30,8 @@ class TaggingConfig(BaseModel):
     @field_validator("tags")
     @classmethod
     def validate_tags(cls, v):
-        if len(v) >= 10:
-            raise ValueError("Tags must be < 10")
+        if len(v) >= MAX_TAG_KEYS:
+            raise ValueError(f"Tags must be < {MAX_TAG_KEYS}")
         if len(v) == 0:
             raise ValueError("tags cannot be empty")
         return v
@@ -43,6 +45,8 @@ class TaggingConfig(BaseModel):
 
 
 class ObjectTags(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     existing: Dict[str, str] = Field(default_factory=dict)
     proposed: Optional[Dict[str, str]] = None
     applied: Optional[Dict[str, str]] = None
@@ -55,38 +59,60 @@ class TaggingResult(BaseModel):
     results: Dict[str, ObjectTags] = Field(default_factory=dict)
     summary: Dict[str, Any] = Field(default_factory=dict)
 
+    # Kept up to date by add_result, so summaries do not rescan the results
+    _processed: int = PrivateAttr(default=0)
+    _skipped: int = PrivateAttr(default=0)
+    _applied: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        for tags in self.results.values():
+            self._count(tags, 1)
+
     def add_result(self, uri: str, tags: ObjectTags) -> None:
+        previous = self.results.get(uri)
+        if previous is not None:
+            self._count(previous, -1)
         self.results[uri] = tags
+        self._count(tags, 1)
+
+    def _count(self, tags: ObjectTags, step: int) -> None:
+        if tags.proposed is not None:
+            self._processed += step
+        if tags.skipped_reason is not None:
+            self._skipped += step
+        if tags.applied is not None:
+            self._applied += step
 
     def get_summary_stats(self) -> Dict[str, Any]:
         total_objects = len(self.results)
-        processed = sum(
-            1 for tags in self.results.values() if tags.proposed is not None
-        )
-        skipped = sum(
-            1 for tags in self.results.values() if tags.skipped_reason is not None
-        )
-        applied = sum(1 for tags in self.results.values() if tags.applied is not None)
+        processed = self._processed
 
         return {
             "total_objects": total_objects,
             "processed": processed,
-            "skipped": skipped,
-            "applied": applied,
+            "skipped": self._skipped,
+            "applied": self._applied,
             "success_rate": processed / total_objects if total_objects > 0 else 0,
         }
 
 
 class LLMRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     content: str = Field(..., description="File content to analyze")
     tags: Dict[str, Optional[List[str]]] = Field(
         ..., description="Tag keys and allowed values"
     )
     filename: str = Field(..., description="Name of the file being analyzed")
     custom_prompt_template: Optional[str] = None
+    prompt: Optional[str] = Field(
+        default=None, description="Pre-rendered prompt, used instead of the template"
+    )
 
 
 class LLMResponse(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     tags: List[str] = Field(..., description="Generated tag values in order")
     confidence: Optional[float] = None
     reasoning: Optional[str] = None
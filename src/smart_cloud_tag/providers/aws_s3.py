@@ -1,17 +1,90 @@
 import os
 import boto3
-from typing import Tuple, Dict
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Optional
 from botocore.exceptions import ClientError, NoCredentialsError
 
-from .base import StorageProvider
+from .base import SharedClients, StorageProvider
+from ..config import DEFAULT_MAX_CONNECTIONS, RANGE_CHUNK_BYTES, STREAM_CHUNK_BYTES
 from ..models import FileType
-from ..utils import parse_s3_uri, get_file_type
+from ..utils import (
+    SUPPORTED_SUFFIXES,
+    get_file_type,
+    parse_s3_uri,
+    parse_uri_prefix,
+    split_byte_range,
+)
 from ..exceptions import StorageError
 
 
+def _object_size_from_content_range(content_range: Optional[str]) -> Optional[int]:
+    # Content-Range has the form "bytes 0-8388607/52428800"
+    if not content_range or "/" not in content_range:
+        return None
+    size = content_range.rsplit("/", 1)[1]
+    return int(size) if size.isdigit() else None
+
+
+_S3_CLIENTS = SharedClients()
+_session: Optional[boto3.session.Session] = None
+
+
+def _create_s3_client(
+    aws_access_key_id: str,
+    aws_secret_access_key: str,
+    region_name: str,
+    max_connections: int,
+):
+    # boto3 sessions are not thread-safe, but clients are; one session is
+    # created lazily and only used while SharedClients holds its lock
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+
+    return _session.client(
+        "s3",
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+        # Adaptive retries back off and rate limit client-side on throttling
+        config=Config(
+            max_pool_connections=max_connections,
+            retries={"max_attempts": 10, "mode": "adaptive"},
+            tcp_keepalive=True,
+        ),
+    )
+
+
+def _read_into(body, view: memoryview) -> int:
+    # Copies the body into view in small reads, so no full-size temporary
+    # bytes object is created per range
+    filled = 0
+    while filled < len(view):
+        chunk = body.read(min(STREAM_CHUNK_BYTES, len(view) - filled))
+        if not chunk:
+            break
+        view[filled : filled + len(chunk)] = chunk
+        filled += len(chunk)
+    return filled
+
+
 class AWSS3Provider(StorageProvider):
-    def __init__(self, storage_uri: str):
+    __slots__ = (
+        "bucket_name",
+        "prefix",
+        "aws_access_key_id",
+        "aws_secret_access_key",
+        "region_name",
+        "s3_client",
+        "_client_key",
+    )
+
+    def __init__(
+        self, storage_uri: str, max_connections: int = DEFAULT_MAX_CONNECTIONS
+    ):
         self.bucket_name = parse_s3_uri(storage_uri)
+        self.prefix = parse_uri_prefix(storage_uri)
 
         self.aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
         self.aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
@@ -26,15 +99,21 @@ class AWSS3Provider(StorageProvider):
                 "AWS credentials not provided. Set AWS environment variables."
             )
 
+        self._client_key = (
+            self.aws_access_key_id,
+            self.aws_secret_access_key,
+            self.region_name,
+            max_connections,
+        )
         try:
-            self.s3_client = boto3.client(
-                "s3",
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region_name,
+            self.s3_client = _S3_CLIENTS.acquire(
+                self._client_key, lambda: _create_s3_client(*self._client_key)
             )
-
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
+            try:
+                self.s3_client.head_bucket(Bucket=self.bucket_name)
+            except Exception:
+                self.close()
+                raise
 
         except NoCredentialsError:
             raise StorageError(
@@ -57,34 +136,79 @@ class AWSS3Provider(StorageProvider):
         try:
             paginator = self.s3_client.get_paginator("list_objects_v2")
 
-            for page in paginator.paginate(Bucket=self.bucket_name):
-                if "Contents" in page:
-                    for obj in page["Contents"]:
-                        if not obj["Key"].endswith("/"):
-                            yield obj["Key"]
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=self.prefix):
+                for obj in page.get("Contents", ()):
+                    # Also drops "/" directory markers
+                    if obj["Key"].lower().endswith(SUPPORTED_SUFFIXES):
+                        yield obj["Key"]
 
         except ClientError as e:
             raise StorageError(f"Failed to list objects: {str(e)}")
 
     def get_object_content(
-        self, obj_key: str, max_bytes: int
+        self, obj_key: str, max_bytes: int, concurrency: int = 1
     ) -> Tuple[bytes, FileType]:
+        content, file_type, _ = self._download(obj_key, max_bytes, concurrency)
+        return content, file_type
+
+    def get_object_content_and_tags(
+        self, obj_key: str, max_bytes: int, concurrency: int = 1
+    ) -> Tuple[bytes, FileType, Dict[str, str]]:
+        content, file_type, tag_count = self._download(obj_key, max_bytes, concurrency)
+        # GetObject reports x-amz-tagging-count, so untagged objects need no
+        # GetObjectTagging round trip
+        tags = self.get_object_tags(obj_key) if tag_count else {}
+        return content, file_type, tags
+
+    def _download(
+        self, obj_key: str, max_bytes: int, concurrency: int
+    ) -> Tuple[bytes, FileType, int]:
         try:
             file_type = get_file_type(obj_key)
             if not file_type:
                 raise StorageError(f"Unsupported file type for {obj_key}")
 
-            if max_bytes > 0:
-                response = self.s3_client.get_object(
-                    Bucket=self.bucket_name, Key=obj_key, Range=f"bytes=0-{max_bytes-1}"
-                )
-            else:
+            if max_bytes <= 0:
                 response = self.s3_client.get_object(
                     Bucket=self.bucket_name, Key=obj_key
                 )
+                return response["Body"].read(), file_type, response.get("TagCount", 0)
 
+            first_end = min(max_bytes, RANGE_CHUNK_BYTES) - 1
+            response = self._get_object_range(obj_key, 0, first_end)
             content = response["Body"].read()
-            return content, file_type
+            tag_count = response.get("TagCount", 0)
+
+            object_size = _object_size_from_content_range(response.get("ContentRange"))
+            limit = min(max_bytes, object_size or len(content))
+            if limit <= len(content):
+                return content, file_type, tag_count
+
+            # Ranges are written straight into their slice of one buffer
+            # instead of being kept as parts and joined
+            buffer = bytearray(limit)
+            view = memoryview(buffer)
+            view[: len(content)] = content
+
+            def fetch_range(byte_range: Tuple[int, int]) -> int:
+                start, end = byte_range
+                body = self._get_object_range(obj_key, start, end)["Body"]
+                return _read_into(body, view[start : end + 1])
+
+            ranges = split_byte_range(len(content), limit, RANGE_CHUNK_BYTES)
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                filled = list(executor.map(fetch_range, ranges))
+
+            # Stop at the first short range, e.g. if the object was truncated
+            end = len(content)
+            for (start, stop), size in zip(ranges, filled):
+                end = start + size
+                if size < stop - start + 1:
+                    break
+
+            content = bytes(view[:end])
+            view.release()
+            return content, file_type, tag_count
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
@@ -95,17 +219,18 @@ class AWSS3Provider(StorageProvider):
             else:
                 raise StorageError(f"Failed to get object content: {str(e)}")
 
+    def _get_object_range(self, obj_key: str, start: int, end: int) -> Dict:
+        return self.s3_client.get_object(
+            Bucket=self.bucket_name, Key=obj_key, Range=f"bytes={start}-{end}"
+        )
+
     def get_object_tags(self, obj_key: str) -> Dict[str, str]:
         try:
             response = self.s3_client.get_object_tagging(
                 Bucket=self.bucket_name, Key=obj_key
             )
 
-            tags = {}
-            for tag in response.get("TagSet", []):
-                tags[tag["Key"]] = tag["Value"]
-
-            return tags
+            return {tag["Key"]: tag["Value"] for tag in response.get("TagSet", ())}
 
         except ClientError as e:
             error_code = e.response["Error"]["Code"]
@@ -114,6 +239,14 @@ class AWSS3Provider(StorageProvider):
             else:
                 raise StorageError(f"Failed to get object tags: {str(e)}")
 
+    def get_object_version(self, obj_key: str) -> Optional[str]:
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=obj_key)
+            return response.get("ETag")
+
+        except ClientError as e:
+            raise StorageError(f"Failed to get object version: {str(e)}")
+
     def set_object_tags(self, obj_key: str, tags: Dict[str, str]) -> None:
         try:
             tag_set = [{"Key": key, "Value": value} for key, value in tags.items()]
@@ -128,5 +261,12 @@ class AWSS3Provider(StorageProvider):
     def is_supported_file_type(self, filename: str) -> bool:
         return get_file_type(filename) is not None
 
+    def close(self) -> None:
+        # Clearing the key makes a repeated close a no-op, so it cannot
+        # release the client again while another provider still uses it
+        client_key, self._client_key = self._client_key, None
+        if client_key is not None:
+            _S3_CLIENTS.release(client_key, lambda client: client.close())
+
     def get_bucket_name(self) -> str:
         return self.bucket_name
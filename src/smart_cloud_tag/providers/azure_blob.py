@@ -1,28 +1,80 @@
 import os
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
+import requests
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import AzureError
+from azure.core.pipeline.transport import RequestsTransport
 
-from .base import StorageProvider
+from .base import SharedClients, StorageProvider
+from ..config import DEFAULT_MAX_CONNECTIONS
 from ..models import FileType
-from ..utils import get_file_type
+from ..utils import SUPPORTED_SUFFIXES, get_file_type, parse_uri_prefix
 from ..exceptions import StorageError
 
+_AZURE_CLIENTS = SharedClients()
+
+
+def _create_blob_service_client(
+    connection_string: str, max_connections: int
+) -> Tuple[requests.Session, BlobServiceClient]:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=max_connections, pool_maxsize=max_connections
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    blob_service_client = BlobServiceClient.from_connection_string(
+        connection_string,
+        transport=RequestsTransport(session=session, session_owner=False),
+    )
+    return session, blob_service_client
+
+
+def _close_blob_service_client(
+    clients: Tuple[requests.Session, BlobServiceClient],
+) -> None:
+    session, blob_service_client = clients
+    blob_service_client.close()
+    session.close()
+
 
 class AzureBlobProvider(StorageProvider):
-    def __init__(self, storage_uri: str, connection_string: str):
+    __slots__ = (
+        "container_name",
+        "prefix",
+        "connection_string",
+        "blob_service_client",
+        "container_client",
+        "_session",
+        "_client_key",
+    )
+
+    def __init__(
+        self,
+        storage_uri: str,
+        connection_string: str,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ):
         self.container_name = self._parse_azure_uri(storage_uri)
+        self.prefix = parse_uri_prefix(storage_uri)
         self.connection_string = connection_string
 
+        self._client_key = (connection_string, max_connections)
+
         try:
-            self.blob_service_client = BlobServiceClient.from_connection_string(
-                self.connection_string
+            self._session, self.blob_service_client = _AZURE_CLIENTS.acquire(
+                self._client_key,
+                lambda: _create_blob_service_client(*self._client_key),
             )
             self.container_client = self.blob_service_client.get_container_client(
                 self.container_name
             )
-
-            self.container_client.get_container_properties()
+            try:
+                self.container_client.get_container_properties()
+            except Exception:
+                self.close()
+                raise
 
         except AzureError as e:
             raise StorageError(f"Failed to initialize Azure Blob client: {str(e)}")
@@ -31,9 +83,7 @@ class AzureBlobProvider(StorageProvider):
         if not uri.startswith("az://"):
             raise ValueError("Azure URI must start with 'az://'")
 
-        parts = uri[5:].split("/", 1)
-        container = parts[0]
-
+        container = uri[5:].partition("/")[0]
         if not container:
             raise ValueError("Invalid Azure URI: missing container name")
 
@@ -41,25 +91,44 @@ class AzureBlobProvider(StorageProvider):
 
     def list_objects(self):
         try:
-            for blob in self.container_client.list_blobs():
-                if not blob.name.endswith("/"):
+            for blob in self.container_client.list_blobs(
+                name_starts_with=self.prefix or None
+            ):
+                if blob.name.lower().endswith(SUPPORTED_SUFFIXES):
                     yield blob.name
         except AzureError as e:
             raise StorageError(f"Failed to list blobs: {str(e)}")
 
     def get_object_content(
-        self, blob_name: str, max_bytes: int
+        self, blob_name: str, max_bytes: int, concurrency: int = 1
     ) -> Tuple[bytes, FileType]:
+        content, file_type, _ = self._download(blob_name, max_bytes, concurrency)
+        return content, file_type
+
+    def get_object_content_and_tags(
+        self, blob_name: str, max_bytes: int, concurrency: int = 1
+    ) -> Tuple[bytes, FileType, Dict[str, str]]:
+        content, file_type, tag_count = self._download(
+            blob_name, max_bytes, concurrency
+        )
+        # The download reports the blob's tag count, so untagged blobs need no
+        # separate tag read
+        tags = self.get_object_tags(blob_name) if tag_count else {}
+        return content, file_type, tags
+
+    def _download(
+        self, blob_name: str, max_bytes: int, concurrency: int
+    ) -> Tuple[bytes, FileType, int]:
         try:
             blob_client = self.container_client.get_blob_client(blob_name)
 
             properties = blob_client.get_blob_properties()
 
             if properties.size <= max_bytes:
-                download_stream = blob_client.download_blob(max_concurrency=1)
+                download_stream = blob_client.download_blob(max_concurrency=concurrency)
             else:
                 download_stream = blob_client.download_blob(
-                    max_concurrency=1, offset=0, length=max_bytes
+                    max_concurrency=concurrency, offset=0, length=max_bytes
                 )
 
             content = download_stream.readall()
@@ -68,7 +137,7 @@ class AzureBlobProvider(StorageProvider):
             if not file_type:
                 raise StorageError(f"Unsupported file type: {blob_name}")
 
-            return content, file_type
+            return content, file_type, download_stream.properties.tag_count or 0
 
         except AzureError as e:
             raise StorageError(f"Failed to get blob content: {str(e)}")
@@ -82,6 +151,14 @@ class AzureBlobProvider(StorageProvider):
         except AzureError as e:
             raise StorageError(f"Failed to get blob tags: {str(e)}")
 
+    def get_object_version(self, blob_name: str) -> Optional[str]:
+        try:
+            blob_client = self.container_client.get_blob_client(blob_name)
+            return blob_client.get_blob_properties().etag
+
+        except AzureError as e:
+            raise StorageError(f"Failed to get blob version: {str(e)}")
+
     def set_object_tags(self, blob_name: str, tags: Dict[str, str]) -> None:
         try:
             blob_client = self.container_client.get_blob_client(blob_name)
@@ -93,5 +170,10 @@ class AzureBlobProvider(StorageProvider):
     def is_supported_file_type(self, filename: str) -> bool:
         return get_file_type(filename) is not None
 
+    def close(self) -> None:
+        client_key, self._client_key = self._client_key, None
+        if client_key is not None:
+            _AZURE_CLIENTS.release(client_key, _close_blob_service_client)
+
     def get_bucket_name(self) -> str:
         return self.container_name
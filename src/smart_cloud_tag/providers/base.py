@@ -1,21 +1,63 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Iterator, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
 from ..models import FileType
 
 
+# Clients keyed by their connection settings and shared by every provider
+# instance created with them, so that connection pools and TLS sessions
+# survive across providers. A client is closed when its last user releases it.
+class SharedClients:
+    def __init__(self):
+        self._clients: Dict[Hashable, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                entry = [factory(), 0]
+                self._clients[key] = entry
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, key: Hashable, close: Callable[[Any], None]) -> None:
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._clients[key]
+        close(entry[0])
+
+
 class StorageProvider(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def list_objects(self) -> Iterator[str]:
         pass
 
     @abstractmethod
-    def get_object_content(self, key: str, max_bytes: int) -> Tuple[bytes, FileType]:
+    def get_object_content(
+        self, key: str, max_bytes: int, concurrency: int = 1
+    ) -> Tuple[bytes, FileType]:
         pass
 
     @abstractmethod
     def get_object_tags(self, key: str) -> Dict[str, str]:
         pass
 
+    # Providers whose downloads report the object's tag count override this to
+    # skip the tag read for untagged objects
+    def get_object_content_and_tags(
+        self, key: str, max_bytes: int, concurrency: int = 1
+    ) -> Tuple[bytes, FileType, Dict[str, str]]:
+        content, file_type = self.get_object_content(key, max_bytes, concurrency)
+        return content, file_type, self.get_object_tags(key)
+
     @abstractmethod
     def set_object_tags(self, key: str, tags: Dict[str, str]) -> None:
         pass
@@ -27,3 +69,11 @@ class StorageProvider(ABC):
     @abstractmethod
     def get_bucket_name(self) -> str:
         pass
+
+    # Identifies the current object content. Must stay unchanged when only
+    # the object's tags are updated.
+    def get_object_version(self, key: str) -> Optional[str]:
+        return None
+
+    def close(self) -> None:
+        pass
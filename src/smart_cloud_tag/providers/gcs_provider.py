@@ -1,7 +1,9 @@
-import re
 from typing import Dict, Iterator, Optional, Tuple
 
 try:
+    import google.auth
+    import requests
+    from google.auth.transport.requests import AuthorizedSession
     from google.cloud import storage
     from google.cloud.exceptions import GoogleCloudError
     from google.cloud.storage.blob import Blob
@@ -14,14 +16,44 @@ except ImportError:
     Blob = None
     Bucket = None
 
+from ..config import DEFAULT_MAX_CONNECTIONS
 from ..exceptions import StorageError
 from ..models import FileType
-from ..utils import get_file_type
-from .base import StorageProvider
+from ..utils import SUPPORTED_SUFFIXES, get_file_type, parse_uri_prefix
+from .base import SharedClients, StorageProvider
+
+_GCS_CLIENTS = SharedClients()
+
+
+def _create_gcs_client(
+    credentials_path: Optional[str], max_connections: int
+) -> "storage.Client":
+    if credentials_path:
+        credentials, project = google.auth.load_credentials_from_file(
+            credentials_path, scopes=storage.Client.SCOPE
+        )
+    else:
+        credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+
+    # The default requests adapter keeps only 10 connections per host, so the
+    # client is given its own session with a larger pool
+    session = AuthorizedSession(credentials)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=max_connections, pool_maxsize=max_connections
+    )
+    session.mount("https://", adapter)
+    return storage.Client(project=project, credentials=credentials, _http=session)
 
 
 class GCSProvider(StorageProvider):
-    def __init__(self, storage_uri: str, credentials_path: Optional[str] = None):
+    __slots__ = ("bucket_name", "prefix", "client", "bucket", "_client_key")
+
+    def __init__(
+        self,
+        storage_uri: str,
+        credentials_path: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ):
         if not GCS_AVAILABLE:
             raise StorageError(
                 "Google Cloud Storage not available. "
@@ -29,15 +61,20 @@ class GCSProvider(StorageProvider):
             )
 
         self.bucket_name = self._parse_gcs_uri(storage_uri)
+        self.prefix = parse_uri_prefix(storage_uri)
 
-        try:
-            if credentials_path:
-                self.client = storage.Client.from_service_account_json(credentials_path)
-            else:
-                self.client = storage.Client()
+        self._client_key = (credentials_path, max_connections)
 
+        try:
+            self.client = _GCS_CLIENTS.acquire(
+                self._client_key, lambda: _create_gcs_client(*self._client_key)
+            )
             self.bucket = self.client.bucket(self.bucket_name)
-            self.bucket.reload()
+            try:
+                self.bucket.reload()
+            except Exception:
+                self.close()
+                raise
 
         except GoogleCloudError as e:
             raise StorageError(f"Failed to initialize GCS client: {str(e)}")
@@ -50,13 +87,7 @@ class GCSProvider(StorageProvider):
                 f"Invalid GCS URI format: {uri}. Must start with 'gs://'"
             )
 
-        path = uri[5:]
-
-        if "/" in path:
-            bucket_name = path.split("/", 1)[0]
-        else:
-            bucket_name = path
-
+        bucket_name = uri[5:].partition("/")[0]
         if not bucket_name:
             raise StorageError(f"Invalid GCS URI: missing bucket name in {uri}")
 
@@ -64,14 +95,16 @@ class GCSProvider(StorageProvider):
 
     def list_objects(self):
         try:
-            for blob in self.bucket.list_blobs():
-                if not blob.name.endswith("/"):
+            # match_glob is case-sensitive while file type detection is not,
+            # so the suffixes are checked here
+            for blob in self.bucket.list_blobs(prefix=self.prefix or None):
+                if blob.name.lower().endswith(SUPPORTED_SUFFIXES):
                     yield blob.name
         except GoogleCloudError as e:
             raise StorageError(f"Failed to list objects: {str(e)}")
 
     def get_object_content(
-        self, obj_name: str, max_bytes: int
+        self, obj_name: str, max_bytes: int, concurrency: int = 1
     ) -> Tuple[bytes, FileType]:
         try:
             blob = self.bucket.blob(obj_name)
@@ -100,6 +133,17 @@ class GCSProvider(StorageProvider):
         except GoogleCloudError as e:
             raise StorageError(f"Failed to get object tags: {str(e)}")
 
+    def get_object_version(self, obj_name: str) -> Optional[str]:
+        # Tags are stored as metadata, which changes the etag but not the generation
+        try:
+            blob = self.bucket.blob(obj_name)
+            blob.reload()
+
+            return str(blob.generation) if blob.generation is not None else None
+
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to get object version: {str(e)}")
+
     def set_object_tags(self, obj_name: str, tags: Dict[str, str]) -> None:
         try:
             blob = self.bucket.blob(obj_name)
@@ -113,5 +157,10 @@ class GCSProvider(StorageProvider):
     def is_supported_file_type(self, filename: str) -> bool:
         return get_file_type(filename) is not None
 
+    def close(self) -> None:
+        client_key, self._client_key = self._client_key, None
+        if client_key is not None:
+            _GCS_CLIENTS.release(client_key, lambda client: client.close())
+
     def get_bucket_name(self) -> str:
         return self.bucket_name
@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
+
+from .config import (
+    DEFAULT_MAX_RETRIES,
+    RETRY_MAX_WAIT_SECONDS,
+    RETRY_MIN_WAIT_SECONDS,
+)
+from .exceptions import LLMError, LLMTransientError
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# Token bucket shared by all worker threads. Tokens refill continuously at
+# rate_per_minute / 60 per second, up to one second worth of requests.
+class RateLimiter:
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1) -> None:
+        # Taken one at a time, so that a batch larger than the bucket
+        # capacity is paced at the configured rate instead of never fitting
+        for _ in range(tokens):
+            self._acquire_one()
+
+    def _acquire_one(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def backoff_delay(
+    attempt: int,
+    min_wait: float = RETRY_MIN_WAIT_SECONDS,
+    max_wait: float = RETRY_MAX_WAIT_SECONDS,
+) -> float:
+    # Exponential backoff with full jitter
+    ceiling = min(max_wait, min_wait * 2**attempt)
+    return random.uniform(min_wait, max(min_wait, ceiling))
+
+
+def with_retries(
+    func: Callable[[T], R],
+    rate_limiter: Optional[RateLimiter] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    retry_on: Tuple[Type[BaseException], ...] = (LLMTransientError,),
+) -> Callable[[T], R]:
+    def call(arg: T) -> R:
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                return func(arg)
+            except retry_on:
+                if attempt >= max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+
+    return call
+
+
+def with_batch_retries(
+    func: Callable[[List[T]], List[Union[R, BaseException]]],
+    rate_limiter: Optional[RateLimiter] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    retry_on: Tuple[Type[BaseException], ...] = (LLMTransientError,),
+) -> Callable[[List[T]], List[Union[R, BaseException]]]:
+    # func returns a result or an exception per item. Every item is a request
+    # of its own to the rate limit, and only the items that failed with a
+    # retryable error are sent again.
+    def call(items: List[T]) -> List[Union[R, BaseException]]:
+        outcomes: Dict[int, Union[R, BaseException]] = {}
+        pending = list(range(len(items)))
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire(len(pending))
+            try:
+                results = func([items[index] for index in pending])
+            except retry_on:
+                if attempt >= max_retries:
+                    raise
+                results = None
+
+            if results is not None:
+                if len(results) != len(pending):
+                    raise LLMError(
+                        f"Expected {len(pending)} batch results, got {len(results)}"
+                    )
+                failed = []
+                for index, outcome in zip(pending, results):
+                    outcomes[index] = outcome
+                    if isinstance(outcome, retry_on):
+                        failed.append(index)
+                if not failed or attempt >= max_retries:
+                    return [outcomes[index] for index in range(len(items))]
+                pending = failed
+
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    return call
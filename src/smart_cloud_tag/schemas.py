@@ -1,19 +1,29 @@
-from typing import Dict, List, Any, Optional
+import re
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Sequence
 from .models import TaggingConfig, ObjectTags
 from .exceptions import SchemaValidationError
 
-
-def get_provider_tag_limits(provider: str) -> Dict[str, int]:
-    limits = {
-        "aws": {"max_tags": 10, "max_key": 128, "max_value": 256},
-        "azure": {"max_tags": 10, "max_key": 128, "max_value": 256},
-        "gcp": {"max_tags": 64, "max_key": 128, "max_value": 1024},
+# Read-only, so callers can share the limits without copying them
+_PROVIDER_TAG_LIMITS: Mapping[str, Mapping[str, int]] = MappingProxyType(
+    {
+        "aws": MappingProxyType({"max_tags": 10, "max_key": 128, "max_value": 256}),
+        "azure": MappingProxyType({"max_tags": 10, "max_key": 128, "max_value": 256}),
+        "gcp": MappingProxyType({"max_tags": 64, "max_key": 128, "max_value": 1024}),
     }
+)
 
-    if provider not in limits:
-        raise SchemaValidationError(f"Unsupported storage provider: {provider}")
 
-    return limits[provider]
+# Letters, digits, "-" and "_" with at least one letter or digit, matching
+# what isalnum() accepts once "-" and "_" are removed
+_TAG_KEY_RE = re.compile(r"[_-]*[^\W_][\w-]*\Z")
+
+
+def get_provider_tag_limits(provider: str) -> Mapping[str, int]:
+    try:
+        return _PROVIDER_TAG_LIMITS[provider]
+    except KeyError:
+        raise SchemaValidationError(f"Unsupported storage provider: {provider}")
 
 
 def validate_tagging_config(config: TaggingConfig, provider: str) -> None:
@@ -22,19 +32,16 @@ def validate_tagging_config(config: TaggingConfig, provider: str) -> None:
     if len(config.tags) >= limits["max_tags"]:
         raise SchemaValidationError(f"Maximum {limits['max_tags']} tags per object")
 
-    if len(config.tags) != len(set(config.tags.keys())):
-        raise SchemaValidationError("Tag keys must be unique")
-
     for key in config.tags.keys():
         if not key or not key.strip():
             raise SchemaValidationError("Tag keys cannot be empty")
         if len(key) > limits["max_key"]:
             raise SchemaValidationError(f"Tag key '{key}' exceeds {limits['max_key']} character limit")
-        if not key.replace("-", "").replace("_", "").isalnum():
+        if not _TAG_KEY_RE.match(key):
             raise SchemaValidationError(f"Tag key '{key}' contains invalid characters")
 
 
-def validate_tag_values(values: List[str], tag_keys: List[str], provider: str) -> None:
+def validate_tag_values(values: Sequence[str], tag_keys: Sequence[str], provider: str) -> None:
     limits = get_provider_tag_limits(provider)
 
     if len(values) != len(tag_keys):
@@ -47,7 +54,7 @@ def validate_tag_values(values: List[str], tag_keys: List[str], provider: str) -
             raise SchemaValidationError(f"Tag value for '{tag_keys[i]}' exceeds {limits['max_value']} character limit")
 
 
-def create_tag_mapping(tag_keys: List[str], values: List[str], provider: str = "aws") -> Dict[str, str]:
+def create_tag_mapping(tag_keys: Sequence[str], values: Sequence[str], provider: str = "aws") -> Dict[str, str]:
     validate_tag_values(values, tag_keys, provider)
 
     tag_mapping = {}
@@ -63,21 +70,47 @@ def validate_existing_tags(tags: Dict[str, str], provider: str) -> None:
     if len(tags) > limits["max_tags"]:
         raise SchemaValidationError(f"Object has {len(tags)} tags, exceeding the limit of {limits['max_tags']}")
 
+    max_key = limits["max_key"]
+    max_value = limits["max_value"]
     for key, value in tags.items():
-        if not key or not key.strip():
+        # strip() of an empty string is empty too, so one check covers both
+        if not key.strip():
             raise SchemaValidationError("Tag key cannot be empty")
-        if len(key) > limits["max_key"]:
-            raise SchemaValidationError(f"Tag key '{key}' exceeds {limits['max_key']} character limit")
-        if not value or not value.strip():
+        if len(key) > max_key:
+            raise SchemaValidationError(f"Tag key '{key}' exceeds {max_key} character limit")
+        if not value.strip():
             raise SchemaValidationError(f"Tag value for '{key}' cannot be empty")
-        if len(value) > limits["max_value"]:
-            raise SchemaValidationError(f"Tag value for '{key}' exceeds {limits['max_value']} character limit")
+        if len(value) > max_value:
+            raise SchemaValidationError(f"Tag value for '{key}' exceeds {max_value} character limit")
+
+
+def is_fully_tagged(existing_tags: Dict[str, str], tags: Dict[str, Optional[List[str]]]) -> bool:
+    for key, allowed_values in tags.items():
+        value = existing_tags.get(key)
+        if not value:
+            return False
+        if allowed_values and value not in allowed_values:
+            return False
+
+    return True
+
+
+def combine_tags(
+    existing_tags: Mapping[str, str],
+    new_tags: Mapping[str, str],
+    tag_keys: Sequence[str],
+) -> Dict[str, str]:
+    # Existing tags under a managed key are replaced by the new ones
+    tag_key_set = frozenset(tag_keys)
+    merged = {k: v for k, v in existing_tags.items() if k not in tag_key_set}
+    merged.update(new_tags)
+    return merged
 
 
 def merge_and_validate_tags(
     existing_tags: Dict[str, str],
     new_tags: Dict[str, str],
-    tag_keys: List[str],
+    tag_keys: Sequence[str],
     provider: str = "aws",
 ) -> Dict[str, str]:
     limits = get_provider_tag_limits(provider)
@@ -85,9 +118,7 @@ def merge_and_validate_tags(
     validate_existing_tags(existing_tags, provider)
     validate_tag_values(list(new_tags.values()), tag_keys, provider)
 
-    merged = {k: v for k, v in existing_tags.items() if k not in tag_keys}
-    merged.update(new_tags)
-
+    merged = combine_tags(existing_tags, new_tags, tag_keys)
     if len(merged) > limits["max_tags"]:
         raise SchemaValidationError(f"Total tags ({len(merged)}) would exceed the limit of {limits['max_tags']}")
 
@@ -100,6 +131,15 @@ def create_object_tags_result(
     applied_tags: Optional[Dict[str, str]] = None,
     skipped_reason: Optional[str] = None,
 ) -> ObjectTags:
+    # Untagged skips (e.g. unsupported file types) have nothing to validate.
+    # Each still gets its own existing dict, so results stay independent.
+    if (
+        not existing_tags
+        and proposed_tags is None
+        and applied_tags is None
+        and skipped_reason is not None
+    ):
+        return ObjectTags.model_construct(skipped_reason=skipped_reason)
     return ObjectTags(
         existing=existing_tags,
         proposed=proposed_tags,
@@ -1,11 +1,27 @@
 import json
+import codecs
 import csv
+import hashlib
 import io
-from typing import List, Dict, Optional, Tuple
+import queue
+import string
+import threading
+from functools import lru_cache
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, TypeVar
 from urllib.parse import urlparse
 import magic
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 from .models import FileType
 from .exceptions import FileProcessingError
+from .schemas import combine_tags, get_provider_tag_limits
 
 
 def parse_s3_uri(uri: str) -> str:
@@ -21,54 +37,151 @@ def parse_s3_uri(uri: str) -> str:
     return bucket
 
 
-def is_supported_file_type(filename: str) -> bool:
-    supported_extensions = {".txt", ".md", ".json", ".csv"}
-    file_ext = filename.lower().split(".")[-1] if "." in filename else ""
-    return f".{file_ext}" in supported_extensions
+def parse_uri_prefix(uri: str) -> str:
+    # "s3://bucket/reports/2024" lists only keys starting with "reports/2024"
+    return urlparse(uri).path.lstrip("/")
 
 
-def get_file_type(filename: str) -> Optional[FileType]:
-    if not is_supported_file_type(filename):
-        return None
+FILE_TYPES_BY_EXTENSION = {file_type.value: file_type for file_type in FileType}
+
+# Lower-case key suffixes of the supported file types, for filtering listings
+SUPPORTED_SUFFIXES = tuple(f".{extension}" for extension in FILE_TYPES_BY_EXTENSION)
+
+
+def split_byte_range(start: int, stop: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [
+        (offset, min(offset + chunk_size, stop) - 1)
+        for offset in range(start, stop, chunk_size)
+    ]
+
+
+T = TypeVar("T")
+
+
+def prefetch(iterable: Iterable[T], buffer_size: int) -> Iterator[T]:
+    # Iterates in a background thread, so that fetching the next listing page
+    # overlaps with processing the objects already listed
+    buffer: "queue.Queue[Tuple[bool, Any]]" = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+
+    def put(entry: Tuple[bool, Any]) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
 
-    file_ext = filename.lower().split(".")[-1]
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put((False, item)):
+                    return
+        except Exception as e:
+            put((True, e))
+            return
+        put((True, None))
+
+    threading.Thread(target=produce, daemon=True).start()
     try:
-        return FileType(file_ext)
-    except ValueError:
+        while True:
+            done, value = buffer.get()
+            if done:
+                if value is not None:
+                    raise value
+                return
+            yield value
+    finally:
+        stopped.set()
+
+
+def is_supported_file_type(filename: str) -> bool:
+    return get_file_type(filename) is not None
+
+
+def get_file_type(filename: str) -> Optional[FileType]:
+    _, dot, extension = filename.rpartition(".")
+    if not dot:
         return None
+    return FILE_TYPES_BY_EXTENSION.get(extension.lower())
 
 
 def detect_mime_type(content: bytes) -> str:
     try:
         return magic.from_buffer(content, mime=True)
     except Exception:
-        if content.startswith(b"{") or content.startswith(b"["):
+        if content.startswith((b"{", b"[")):
             return "application/json"
-        elif b"," in content[:1000] and b"\n" in content[:1000]:
+
+        sample = content[:1000]
+        if b"," in sample and b"\n" in sample:
             return "text/csv"
-        else:
-            return "text/plain"
+        return "text/plain"
+
+
+def _join_within(chunks: Iterable[str], max_bytes: Optional[int]) -> str:
+    # Stops consuming chunks once the text is at least max_bytes long. Every
+    # character is at least one byte, so the result still holds the first
+    # max_bytes bytes of the full text for truncate_content to cut.
+    if max_bytes is None:
+        return "".join(chunks)
+
+    parts = []
+    length = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        length += len(chunk)
+        if length >= max_bytes:
+            break
+    return "".join(parts)
+
+
+def _csv_lines(reader: Iterator[List[str]]) -> Iterator[str]:
+    header = next(reader, None)
+    if header is None:
+        return
 
+    yield f"Headers: {', '.join(header)}"
+    for i, row in enumerate(reader, 1):
+        yield f"\nRow {i}: {', '.join(row)}"
 
-def parse_file_content(content: bytes, file_type: FileType) -> str:
+
+def parse_file_content(
+    content: bytes, file_type: FileType, max_bytes: Optional[int] = None
+) -> str:
+    # With max_bytes, formatting stops once enough text for the preview has
+    # been produced
     try:
         if file_type == FileType.JSON:
-            data = json.loads(content.decode("utf-8"))
-            return json.dumps(data, indent=2, ensure_ascii=False)
-
-        elif file_type == FileType.CSV:
-            text_content = content.decode("utf-8")
-            reader = csv.reader(io.StringIO(text_content))
-            rows = list(reader)
-
-            output = []
-            for i, row in enumerate(rows):
-                if i == 0:
-                    output.append(f"Headers: {', '.join(row)}")
+            if ORJSON_AVAILABLE:
+                try:
+                    encoded = orjson.dumps(
+                        orjson.loads(content), option=orjson.OPT_INDENT_2
+                    )
+                except (orjson.JSONDecodeError, orjson.JSONEncodeError):
+                    # The json module also accepts NaN, integers beyond 64
+                    # bits and encodings other than UTF-8
+                    pass
                 else:
-                    output.append(f"Row {i}: {', '.join(row)}")
+                    # orjson formats in one call, so the limit is applied by
+                    # cutting its output; ignore drops a character split at
+                    # the cut
+                    if max_bytes is not None:
+                        encoded = encoded[:max_bytes]
+                    return encoded.decode("utf-8", errors="ignore")
+
+            # json.loads detects the encoding of bytes itself
+            data = json.loads(content)
+            encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+            return _join_within(encoder.iterencode(data), max_bytes)
 
-            return "\n".join(output)
+        elif file_type == FileType.CSV:
+            # Decoded while the reader consumes it, without a full str copy
+            reader = csv.reader(
+                io.TextIOWrapper(io.BytesIO(content), encoding="utf-8", newline="")
+            )
+            return _join_within(_csv_lines(reader), max_bytes)
 
         else:
             return content.decode("utf-8")
@@ -77,70 +190,78 @@ def parse_file_content(content: bytes, file_type: FileType) -> str:
         raise FileProcessingError(f"Failed to parse {file_type.value} file: {str(e)}")
 
 
+# File types whose content is used as-is, without a parser
+PLAIN_TEXT_FILE_TYPES = frozenset({FileType.TXT, FileType.MD})
+
+
+def _decode_utf8_prefix(content: bytes) -> str:
+    # A non-final incremental decode holds back a character cut off at the
+    # end, while invalid bytes anywhere else still raise
+    return codecs.getincrementaldecoder("utf-8")().decode(content)
+
+
+def decode_text_content(content: bytes, max_bytes: int) -> str:
+    # Cutting the bytes first means only what is kept gets decoded. A character
+    # split by the cut (or by a ranged download) is dropped, as in truncate_content.
+    try:
+        return _decode_utf8_prefix(content[:max_bytes])
+    except UnicodeDecodeError as e:
+        raise FileProcessingError(f"Failed to decode text content: {str(e)}")
+
+
 def truncate_content(content: str, max_bytes: int) -> str:
+    # ASCII text has one byte per character, and no character needs more
+    # than four, so neither case has to be encoded to be measured
+    if content.isascii():
+        return content[:max_bytes]
+    if len(content) * 4 <= max_bytes:
+        return content
+
     content_bytes = content.encode("utf-8")
     if len(content_bytes) <= max_bytes:
         return content
 
-    truncated_bytes = content_bytes[:max_bytes]
-    try:
-        return truncated_bytes.decode("utf-8")
-    except UnicodeDecodeError:
-        while truncated_bytes and truncated_bytes[-1] & 0xC0 == 0x80:
-            truncated_bytes = truncated_bytes[:-1]
-        return truncated_bytes.decode("utf-8", errors="ignore")
+    # The bytes come from encoding a str, so the only invalid sequence the cut
+    # can leave is a partial character at the end, which is dropped
+    return _decode_utf8_prefix(content_bytes[:max_bytes])
 
 
 def merge_tags(
-    existing_tags: Dict[str, str], new_tags: Dict[str, str], tag_keys: List[str]
+    existing_tags: Dict[str, str],
+    new_tags: Dict[str, str],
+    tag_keys: List[str],
+    provider: str = "aws",
 ) -> Dict[str, str]:
-    merged = {k: v for k, v in existing_tags.items() if k not in tag_keys}
-    merged.update(new_tags)
+    max_tags = get_provider_tag_limits(provider)["max_tags"]
+    merged = combine_tags(existing_tags, new_tags, tag_keys)
 
-    if len(merged) > 10:
-        raise ValueError(f"Total tags ({len(merged)}) would exceed the limit of 10")
+    if len(merged) > max_tags:
+        raise ValueError(
+            f"Total tags ({len(merged)}) would exceed the limit of {max_tags}"
+        )
 
     return merged
 
 
-def format_llm_prompt(
-    tags: Dict[str, Optional[List[str]]], content_preview: str, filename: str
-) -> str:
-    from .config import DEFAULT_PROMPT_TEMPLATE
-
-    if not filename or not filename.strip():
-        raise ValueError("filename is required and cannot be empty")
-
-    tag_keys = list(tags.keys())
+# Literal text, then the per-object placeholder after it ("content", "filename"
+# or None at the end) with its conversion and format spec
+CompiledPrompt = Tuple[Tuple[str, Optional[str], Optional[str], str], ...]
 
-    constraints = []
-    for key, allowed_values in tags.items():
-        if allowed_values is None:
-            constraints.append(
-                f"- {key}: deduce appropriate value based on content and key name"
-            )
-        else:
-            constraints.append(f"- {key}: must be one of {allowed_values}")
+_FORMATTER = string.Formatter()
 
-    constraints_text = "\n".join(constraints)
-    filename_context = f"\nFile being analyzed: {filename}\n"
 
-    prompt = DEFAULT_PROMPT_TEMPLATE.format(
-        num_tags=len(tag_keys),
-        constraints_text=constraints_text,
-        filename_context=filename_context,
-        content_preview=content_preview,
+def _format_constraints(tags: Dict[str, Optional[List[str]]]) -> str:
+    return "\n".join(
+        (
+            f"- {key}: deduce appropriate value based on content and key name"
+            if allowed_values is None
+            else f"- {key}: must be one of {allowed_values}"
+        )
+        for key, allowed_values in tags.items()
     )
 
-    return prompt
-
 
-def format_custom_llm_prompt(
-    custom_template: str,
-    tags: Dict[str, Optional[List[str]]],
-    content_preview: str,
-    filename: str,
-) -> str:
+def _check_custom_prompt_template(custom_template: str) -> None:
     required_placeholders = ["{tags}", "{content}", "{filename}"]
     missing_placeholders = []
 
@@ -154,6 +275,25 @@ def format_custom_llm_prompt(
             f"Required placeholders: {required_placeholders}"
         )
 
+
+def format_llm_prompt(
+    tags: Dict[str, Optional[List[str]]], content_preview: str, filename: str
+) -> str:
+    if not filename or not filename.strip():
+        raise ValueError("filename is required and cannot be empty")
+
+    # Only the content and filename differ between calls with the same tags
+    return render_llm_prompt(get_compiled_llm_prompt(tags), content_preview, filename)
+
+
+def format_custom_llm_prompt(
+    custom_template: str,
+    tags: Dict[str, Optional[List[str]]],
+    content_preview: str,
+    filename: str,
+) -> str:
+    _check_custom_prompt_template(custom_template)
+
     formatted_prompt = custom_template.format(
         tags=tags, content=content_preview, filename=filename
     )
@@ -161,24 +301,165 @@ def format_custom_llm_prompt(
     return formatted_prompt
 
 
+def compile_llm_prompt(
+    tags: Dict[str, Optional[List[str]]],
+    custom_prompt_template: Optional[str] = None,
+) -> CompiledPrompt:
+    # Substitutes everything that is fixed for a tagging run once, leaving only
+    # the content and filename to be filled in per object by render_llm_prompt
+    if custom_prompt_template:
+        _check_custom_prompt_template(custom_prompt_template)
+        template = custom_prompt_template
+        static_values: Dict[str, Any] = {"tags": tags}
+        object_fields = {"content": "content", "filename": "filename"}
+    else:
+        from .config import DEFAULT_PROMPT_TEMPLATE
+
+        template = DEFAULT_PROMPT_TEMPLATE
+        static_values = {
+            "num_tags": len(tags),
+            "constraints_text": _format_constraints(tags),
+        }
+        object_fields = {"content_preview": "content"}
+
+    segments = []
+    literal = ""
+    for text, field_name, format_spec, conversion in _FORMATTER.parse(template):
+        literal += text
+        if field_name is None:
+            continue
+
+        if field_name == "filename_context" and not custom_prompt_template:
+            segments.append((literal + "\nFile being analyzed: ", "filename", None, ""))
+            literal = "\n"
+        elif field_name in object_fields:
+            segments.append(
+                (literal, object_fields[field_name], conversion, format_spec or "")
+            )
+            literal = ""
+        else:
+            try:
+                value, _ = _FORMATTER.get_field(field_name, (), static_values)
+            except (KeyError, IndexError, AttributeError):
+                raise ValueError(
+                    f"Prompt template has an unknown placeholder: {{{field_name}}}"
+                )
+            literal += _FORMATTER.format_field(
+                _FORMATTER.convert_field(value, conversion), format_spec or ""
+            )
+
+    segments.append((literal, None, None, ""))
+    return tuple(segments)
+
+
+@lru_cache(maxsize=64)
+def _cached_llm_prompt(
+    tags_key: Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...],
+    custom_prompt_template: Optional[str],
+) -> CompiledPrompt:
+    tags = {
+        key: list(allowed_values) if allowed_values is not None else None
+        for key, allowed_values in tags_key
+    }
+    return compile_llm_prompt(tags, custom_prompt_template)
+
+
+def get_compiled_llm_prompt(
+    tags: Dict[str, Optional[List[str]]],
+    custom_prompt_template: Optional[str] = None,
+) -> CompiledPrompt:
+    return _cached_llm_prompt(tags_cache_key(tags), custom_prompt_template or None)
+
+
+def render_llm_prompt(compiled: CompiledPrompt, content: str, filename: str) -> str:
+    values = {"content": content, "filename": filename}
+    parts = []
+    for literal, field, conversion, format_spec in compiled:
+        parts.append(literal)
+        if field is not None:
+            value: Any = values[field]
+            if conversion or format_spec:
+                value = _FORMATTER.format_field(
+                    _FORMATTER.convert_field(value, conversion), format_spec
+                )
+            parts.append(value)
+
+    return "".join(parts)
+
+
+def tags_cache_key(
+    tags: Dict[str, Optional[List[str]]],
+) -> Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...]:
+    return tuple(
+        (key, tuple(allowed_values) if allowed_values is not None else None)
+        for key, allowed_values in tags.items()
+    )
+
+
+@lru_cache(maxsize=64)
+def _tag_response_schema(
+    tags_key: Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...],
+) -> Dict[str, Any]:
+    properties: Dict[str, Any] = {}
+    for key, allowed_values in tags_key:
+        properties[key] = {"type": "string"}
+        if allowed_values:
+            properties[key]["enum"] = list(allowed_values)
+
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [key for key, _ in tags_key],
+        "additionalProperties": False,
+    }
+
+
+def build_tag_response_schema(tags: Dict[str, Optional[List[str]]]) -> Dict[str, Any]:
+    # Cached per tag schema and shared between calls, so callers must not mutate it
+    return _tag_response_schema(tags_cache_key(tags))
+
+
+def object_fingerprint(tags: Dict[str, Optional[List[str]]], version: str) -> str:
+    payload = f"{json.dumps(tags)}\0{version}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def parse_structured_llm_response(
+    data: Dict[str, Any], tag_keys: List[str]
+) -> List[str]:
+    values = []
+    for key in tag_keys:
+        value = data.get(key)
+        value = str(value).strip() if value is not None else ""
+        values.append(value or "general")
+
+    return values
+
+
+_RESPONSE_PREFIXES = (
+    "Generated tags:",
+    "Tags:",
+    "Values:",
+    "Here are the tags:",
+    "The tags are:",
+    "Based on the content:",
+)
+
+
 def parse_llm_response(response: str, tag_keys: List[str]) -> List[str]:
     cleaned = response.strip()
 
-    prefixes_to_remove = [
-        "Generated tags:",
-        "Tags:",
-        "Values:",
-        "Here are the tags:",
-        "The tags are:",
-        "Based on the content:",
-    ]
-
-    for prefix in prefixes_to_remove:
-        if cleaned.startswith(prefix):
-            cleaned = cleaned[len(prefix) :].strip()
+    # Most responses have no prefix, which a single tuple check rules out
+    if cleaned.startswith(_RESPONSE_PREFIXES):
+        for prefix in _RESPONSE_PREFIXES:
+            if cleaned.startswith(prefix):
+                cleaned = cleaned[len(prefix) :].strip()
 
-    values = [v.strip().strip("\"'") for v in cleaned.split(",")]
-    values = [v for v in values if v]
+    values = [
+        value
+        for value in (part.strip().strip("\"'") for part in cleaned.split(","))
+        if value
+    ]
 
     if len(values) < len(tag_keys):
         while len(values) < len(tag_keys):
@@ -0,0 +1,96 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from smart_cloud_tag.exceptions import LLMError
+from smart_cloud_tag.llm.batching import BatchingLLMClient
+from smart_cloud_tag.models import LLMRequest, LLMResponse
+
+
+def make_request(content):
+    return LLMRequest(content=content, tags={"type": None}, filename="test.txt")
+
+
+class TestBatchingLLMClient:
+    def test_flushes_full_batches(self):
+        batches = []
+
+        def generate_batch(requests):
+            batches.append([request.content for request in requests])
+            return [LLMResponse(tags=[request.content]) for request in requests]
+
+        client = BatchingLLMClient(generate_batch, batch_size=2, max_wait_ms=10_000)
+        futures = [client.submit(make_request(str(i))) for i in range(4)]
+
+        assert [future.result(timeout=5).tags for future in futures] == [
+            ["0"],
+            ["1"],
+            ["2"],
+            ["3"],
+        ]
+        assert sorted(batches) == [["0", "1"], ["2", "3"]]
+        client.close()
+
+    def test_flushes_partial_batch_after_wait(self):
+        client = BatchingLLMClient(
+            lambda requests: [LLMResponse(tags=["ok"]) for _ in requests],
+            batch_size=16,
+            max_wait_ms=10,
+        )
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(
+                executor.map(
+                    client.generate_tags, [make_request(str(i)) for i in range(3)]
+                )
+            )
+
+        assert [response.tags for response in results] == [["ok"]] * 3
+        client.close()
+
+    def test_batch_error_is_raised_to_every_caller(self):
+        def generate_batch(requests):
+            raise LLMError("boom")
+
+        client = BatchingLLMClient(generate_batch, batch_size=2, max_wait_ms=10)
+        futures = [client.submit(make_request(str(i))) for i in range(2)]
+
+        for future in futures:
+            with pytest.raises(LLMError):
+                future.result(timeout=5)
+        client.close()
+
+    def test_failed_request_only_fails_its_caller(self):
+        client = BatchingLLMClient(
+            lambda requests: [LLMResponse(tags=["ok"]), LLMError("boom")],
+            batch_size=2,
+            max_wait_ms=10_000,
+        )
+        first, second = [client.submit(make_request(str(i))) for i in range(2)]
+
+        assert first.result(timeout=5).tags == ["ok"]
+        with pytest.raises(LLMError):
+            second.result(timeout=5)
+        client.close()
+
+    def test_submit_after_close(self):
+        client = BatchingLLMClient(lambda requests: [], batch_size=2)
+        client.close()
+
+        with pytest.raises(LLMError):
+            client.submit(make_request("late"))
+
+    def test_batches_group_similar_lengths(self):
+        batches = []
+
+        def generate_batch(requests):
+            batches.append(sorted(len(request.content) for request in requests))
+            return [LLMResponse(tags=["ok"]) for _ in requests]
+
+        client = BatchingLLMClient(
+            generate_batch, batch_size=2, max_wait_ms=10_000, num_buckets=2
+        )
+        contents = ["a", "b" * 1000, "c", "d" * 1000]
+        futures = [client.submit(make_request(content)) for content in contents]
+        for future in futures:
+            future.result(timeout=5)
+        client.close()
+
+        assert sorted(batches) == [[1, 1], [1000, 1000]]
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+from smart_cloud_tag.cache import LLMResponseCache
+from smart_cloud_tag.models import LLMRequest, LLMResponse
+
+
+def make_request(content="Sample content", filename="test.txt"):
+    return LLMRequest(content=content, tags={"type": ["document"]}, filename=filename)
+
+
+class TestLLMResponseCache:
+    def test_make_key(self):
+        key = LLMResponseCache.make_key("openai:gpt-5", make_request())
+
+        assert key == LLMResponseCache.make_key("openai:gpt-5", make_request())
+        assert key != LLMResponseCache.make_key("openai:gpt-4o", make_request())
+        assert key != LLMResponseCache.make_key(
+            "openai:gpt-5", make_request(content="Other content")
+        )
+        assert key != LLMResponseCache.make_key(
+            "openai:gpt-5", make_request(filename="other.txt")
+        )
+
+    def test_get_and_set(self):
+        cache = LLMResponseCache()
+        response = LLMResponse(tags=["document"])
+
+        assert cache.get("key") is None
+        cache.set("key", response)
+        assert cache.get("key") == response
+
+    def test_evicts_least_recently_used(self):
+        cache = LLMResponseCache(maxsize=2)
+        cache.set("a", LLMResponse(tags=["a"]))
+        cache.set("b", LLMResponse(tags=["b"]))
+        cache.get("a")
+        cache.set("c", LLMResponse(tags=["c"]))
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+
+    @patch("smart_cloud_tag.cache.time.monotonic")
+    def test_entries_expire_after_ttl(self, mock_monotonic):
+        cache = LLMResponseCache(ttl=60)
+        mock_monotonic.return_value = 1000.0
+        cache.set("key", LLMResponse(tags=["document"]))
+
+        mock_monotonic.return_value = 1059.0
+        assert cache.get("key") is not None
+
+        mock_monotonic.return_value = 1061.0
+        assert cache.get("key") is None
@@ -1,7 +1,21 @@
+import asyncio
+import json
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 from smart_cloud_tag import SmartCloudTagger
-from smart_cloud_tag.exceptions import ConfigurationError
+from smart_cloud_tag.exceptions import ConfigurationError, LLMError
+from smart_cloud_tag.llm.openai_provider import OpenAIBatchProvider
+from smart_cloud_tag.models import FileType, LLMResponse, ProcessingMode
+
+
+def read_content_and_tags_separately(storage):
+    # Serves the combined read the way the StorageProvider default does, so
+    # tests can script get_object_content and get_object_tags on their own
+    storage.get_object_content_and_tags.side_effect = lambda key, *args: (
+        *storage.get_object_content(key, *args),
+        storage.get_object_tags(key),
+    )
 
 
 class TestSmartCloudTagger:
@@ -127,3 +141,608 @@ class TestSmartCloudTagger:
                     info = tagger.get_tags_info()
                     assert info["type"] == "Allowed values: ['document', 'image']"
                     assert info["category"] == "LLM will deduce value"
+
+    def test_process_objects_preview(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = iter(
+                        ["a.txt", "b.pdf", "c.txt"]
+                    )
+                    storage.is_supported_file_type.side_effect = lambda key: (
+                        key.endswith(".txt")
+                    )
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document", "image"]},
+                        max_workers=4,
+                    )
+                    result = tagger.preview_tags()
+
+                    assert list(result.results) == ["a.txt", "b.pdf", "c.txt"]
+                    assert result.results["a.txt"].proposed == {"type": "document"}
+                    assert result.results["b.pdf"].skipped_reason == (
+                        "Unsupported file type"
+                    )
+                    assert result.summary["processed"] == 2
+                    storage.set_object_tags.assert_not_called()
+
+    def test_init_with_invalid_max_workers(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider"):
+            with patch("smart_cloud_tag.core.OpenAIProvider"):
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    with pytest.raises(ConfigurationError):
+                        SmartCloudTagger(
+                            storage_uri="s3://test-bucket",
+                            tags={"type": ["document"]},
+                            max_workers=0,
+                        )
+
+    def test_process_objects_batched(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = iter(
+                        ["a.txt", "b.txt", "c.txt"]
+                    )
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    llm = mock_llm.return_value
+                    llm.generate_tags_batch.side_effect = lambda requests: [
+                        LLMResponse(tags=["document"]) for _ in requests
+                    ]
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document", "image"]},
+                        llm_batch_size=2,
+                    )
+                    result = tagger.apply_tags()
+
+                    assert llm.generate_tags_batch.call_count == 2
+                    llm.generate_tags.assert_not_called()
+                    assert result.summary["applied"] == 3
+                    assert result.results["c.txt"].applied == {"type": "document"}
+
+    def test_apreview_tags(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider"):
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    mock_provider.return_value.list_objects.return_value = iter([])
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket", tags={"type": ["document"]}
+                    )
+                    result = asyncio.run(tagger.apreview_tags())
+
+                    assert result.mode == ProcessingMode.PREVIEW
+                    assert result.summary == {"message": "No objects found in bucket"}
+
+    def test_apply_after_preview_reuses_llm_responses(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.side_effect = lambda: iter(["a.txt"])
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    llm = mock_llm.return_value
+                    llm.generate_tags.return_value = LLMResponse(tags=["document"])
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document", "image"]},
+                    )
+                    tagger.preview_tags()
+                    result = tagger.apply_tags()
+
+                    assert llm.generate_tags.call_count == 1
+                    assert result.results["a.txt"].applied == {"type": "document"}
+
+    def test_init_with_invalid_custom_prompt_template(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider"):
+            with patch("smart_cloud_tag.core.OpenAIProvider"):
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    with pytest.raises(ConfigurationError):
+                        SmartCloudTagger(
+                            storage_uri="s3://test-bucket",
+                            tags={"type": ["document"]},
+                            custom_prompt_template="Only {content}",
+                        )
+
+    def test_context_manager_closes_clients(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    with SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        max_workers=100,
+                    ) as tagger:
+                        assert tagger.llm_provider is mock_llm.return_value
+
+                    assert mock_llm.call_args.kwargs["max_connections"] == 100
+                    mock_llm.return_value.close.assert_called_once()
+                    mock_provider.return_value.close.assert_called_once()
+
+    def test_process_objects_streams_listing(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    keys = [f"doc{i}.txt" for i in range(10)]
+                    tagged_while_listing = []
+
+                    def list_objects():
+                        for key in keys:
+                            tagged_while_listing.append(
+                                mock_llm.return_value.generate_tags.call_count
+                            )
+                            yield key
+
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.side_effect = list_objects
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        max_workers=1,
+                        cache_enabled=False,
+                    )
+                    result = tagger.preview_tags()
+
+                    assert list(result.results) == keys
+                    assert result.summary["total_objects"] == 10
+                    # Listing runs at most the in-flight window plus the
+                    # prefetch buffer ahead of tagging
+                    assert tagged_while_listing[-1] >= 4
+
+    def test_process_objects_dedupes_identical_content(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = ["a.txt", "b.txt", "c.txt"]
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.side_effect = lambda key, *_: (
+                        b"other" if key == "c.txt" else b"same",
+                        FileType.TXT,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        cache_enabled=False,
+                        dedupe_content=True,
+                    )
+                    result = tagger.preview_tags()
+
+                    assert result.summary["total_objects"] == 3
+                    assert result.results["b.txt"].proposed == {"type": "document"}
+                    assert mock_llm.return_value.generate_tags.call_count == 2
+
+    def test_process_objects_writes_results_file(self, tmp_path):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = ["a.txt", "b.pdf"]
+                    storage.is_supported_file_type.side_effect = lambda key: (
+                        key.endswith(".txt")
+                    )
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                    )
+                    results_path = tmp_path / "results.jsonl"
+                    tagger.preview_tags(results_path=str(results_path))
+
+                    lines = [
+                        json.loads(line)
+                        for line in results_path.read_text().splitlines()
+                    ]
+                    assert [line["uri"] for line in lines] == ["a.txt", "b.pdf"]
+                    assert lines[0]["result"]["proposed"] == {"type": "document"}
+                    assert lines[1]["result"]["skipped_reason"] == (
+                        "Unsupported file type"
+                    )
+
+    def test_use_batch_api(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider"):
+            with patch("smart_cloud_tag.core.OpenAIBatchProvider") as mock_batch:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        max_workers=64,
+                        use_batch_api=True,
+                    )
+
+                    assert tagger.llm_provider is mock_batch.return_value
+                    assert tagger.llm_batch_size is None
+
+                    with pytest.raises(ConfigurationError):
+                        SmartCloudTagger(
+                            storage_uri="s3://test-bucket",
+                            tags={"type": ["document"]},
+                            llm_provider="anthropic",
+                            use_batch_api=True,
+                        )
+
+    def test_use_batch_api_collects_run_into_one_job(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIBatchProvider") as mock_batch:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = iter(
+                        ["a.txt", "skip.pdf", "b.txt", "c.txt"]
+                    )
+                    storage.is_supported_file_type.side_effect = lambda key: (
+                        key.endswith(".txt")
+                    )
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.side_effect = lambda key, *_: (
+                        key.encode("utf-8"),
+                        FileType.TXT,
+                    )
+                    llm = mock_batch.return_value
+                    llm.submit_batch.return_value = "batch-1"
+                    llm.collect_batch.return_value = [
+                        LLMResponse(tags=["document"]),
+                        None,
+                        LLMResponse(tags=["image"]),
+                    ]
+                    llm.generate_tags.return_value = LLMResponse(tags=["document"])
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document", "image"]},
+                        use_batch_api=True,
+                        cache_enabled=False,
+                    )
+                    result = tagger.preview_tags()
+
+                    llm.submit_batch.assert_called_once()
+                    requests = llm.submit_batch.call_args.args[0]
+                    assert [request.content for request in requests] == [
+                        "a.txt",
+                        "b.txt",
+                        "c.txt",
+                    ]
+                    assert llm.collect_batch.call_args.args[0] == "batch-1"
+                    llm.generate_tags_batch.assert_not_called()
+                    # Only the request the job could not complete is sent again
+                    llm.generate_tags.assert_called_once()
+                    assert list(result.results) == [
+                        "a.txt",
+                        "skip.pdf",
+                        "b.txt",
+                        "c.txt",
+                    ]
+                    assert result.results["c.txt"].proposed == {"type": "image"}
+                    assert result.results["b.txt"].proposed == {"type": "document"}
+
+    @patch("smart_cloud_tag.llm.openai_provider.time.sleep")
+    def test_use_batch_api_deadline_keeps_completed_requests(self, mock_sleep):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIBatchProvider") as mock_batch:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = iter(["a.txt", "b.txt"])
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.side_effect = lambda key, *_: (
+                        key.encode("utf-8"),
+                        FileType.TXT,
+                    )
+                    # A real provider over a scripted client, whose job is
+                    # cancelled at the deadline with only "a.txt" done
+                    provider = OpenAIBatchProvider.__new__(OpenAIBatchProvider)
+                    provider.model = "gpt-test"
+                    provider.poll_interval = 30
+                    provider.max_retries = 0
+                    provider.client = Mock()
+                    provider.client.batches.retrieve.side_effect = [
+                        SimpleNamespace(status="in_progress"),
+                        SimpleNamespace(status="cancelled", output_file_id="out"),
+                    ]
+                    provider.client.files.content.return_value.text = json.dumps(
+                        {
+                            "custom_id": "0",
+                            "response": {
+                                "status_code": 200,
+                                "body": {
+                                    "choices": [
+                                        {"message": {"content": '{"type": "image"}'}}
+                                    ]
+                                },
+                            },
+                        }
+                    )
+                    provider.generate_tags = Mock(
+                        return_value=LLMResponse(tags=["document"])
+                    )
+                    mock_batch.return_value = provider
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document", "image"]},
+                        use_batch_api=True,
+                        batch_api_timeout=1e-9,
+                        cache_enabled=False,
+                    )
+                    result = tagger.preview_tags()
+
+                    provider.client.batches.cancel.assert_called_once()
+                    assert result.results["a.txt"].proposed == {"type": "image"}
+                    assert result.results["b.txt"].proposed == {"type": "document"}
+                    provider.generate_tags.assert_called_once()
+                    assert provider.generate_tags.call_args.args[0].content == "b.txt"
+
+    def test_use_batch_api_job_failure(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIBatchProvider") as mock_batch:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = iter(["a.txt", "b.txt"])
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    llm = mock_batch.return_value
+                    llm.collect_batch.side_effect = LLMError("batch timed out")
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        use_batch_api=True,
+                        dedupe_content=True,
+                    )
+                    result = tagger.preview_tags()
+
+                    assert len(llm.submit_batch.call_args.args[0]) == 1
+                    for object_tags in result.results.values():
+                        assert "batch timed out" in object_tags.skipped_reason
+
+    def test_process_objects_skips_fully_tagged(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    existing = {
+                        "done.txt": {"type": "document", "owner": "ops"},
+                        "invalid.txt": {"type": "spreadsheet", "owner": "ops"},
+                        "partial.txt": {"type": "document"},
+                    }
+                    storage = mock_provider.return_value
+                    storage.list_objects.return_value = iter(existing)
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.side_effect = existing.get
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document", "finance"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document", "image"], "owner": None},
+                        skip_fully_tagged=True,
+                    )
+                    result = tagger.preview_tags()
+
+                    assert result.results["done.txt"].skipped_reason == (
+                        "Already fully tagged"
+                    )
+                    assert result.results["invalid.txt"].proposed is not None
+                    assert result.results["partial.txt"].proposed is not None
+                    assert storage.get_object_content.call_count == 2
+
+    def test_track_changes_skips_unchanged_objects(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    stored_tags = {"doc.txt": {}}
+                    storage = mock_provider.return_value
+                    storage.list_objects.side_effect = lambda: iter(stored_tags)
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.side_effect = lambda key: dict(
+                        stored_tags[key]
+                    )
+                    storage.set_object_tags.side_effect = stored_tags.__setitem__
+                    storage.get_object_version.return_value = '"etag-1"'
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document", "image"]},
+                        skip_fully_tagged=False,
+                        track_changes=True,
+                        cache_enabled=False,
+                    )
+                    first = tagger.apply_tags()
+                    assert first.results["doc.txt"].applied["type"] == "document"
+                    assert "smart_cloud_tag_fingerprint" in stored_tags["doc.txt"]
+
+                    second = tagger.apply_tags()
+                    assert second.results["doc.txt"].skipped_reason == (
+                        "Unchanged since last run"
+                    )
+
+                    storage.get_object_version.return_value = '"etag-2"'
+                    third = tagger.apply_tags()
+                    assert third.results["doc.txt"].applied is not None
+                    assert storage.get_object_content.call_count == 2
+
+    def test_process_objects_with_parse_workers(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    read_content_and_tags_separately(storage)
+                    storage.list_objects.return_value = iter(["data.json"])
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b'{"kind": "report"}',
+                        FileType.JSON,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    with SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        parse_workers=1,
+                    ) as tagger:
+                        result = tagger.preview_tags()
+
+                    request = mock_llm.return_value.generate_tags.call_args.args[0]
+                    assert request.content == '{\n  "kind": "report"\n}'
+                    assert result.results["data.json"].proposed == {"type": "document"}
+
+    def test_process_objects_reports_progress(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    storage.list_objects.return_value = iter(
+                        ["a.txt", "b.txt", "c.pdf"]
+                    )
+                    storage.is_supported_file_type.side_effect = lambda key: (
+                        key.endswith(".txt")
+                    )
+                    storage.get_object_tags.return_value = {}
+                    storage.get_object_content.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket", tags={"type": ["document"]}
+                    )
+                    progress = []
+                    tagger.preview_tags(
+                        progress_callback=lambda done, listed: progress.append(
+                            (done, listed)
+                        )
+                    )
+
+                    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+    def test_process_objects_fetches_content_and_tags_together(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    storage.list_objects.return_value = iter(["doc.txt"])
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_content_and_tags.return_value = (
+                        b"Sample content",
+                        FileType.TXT,
+                        {"owner": "ops"},
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        skip_fully_tagged=False,
+                    )
+                    result = tagger.preview_tags()
+
+                    assert result.results["doc.txt"].existing == {"owner": "ops"}
+                    storage.get_object_tags.assert_not_called()
+                    storage.get_object_content.assert_not_called()
+
+    def test_apply_skips_write_when_tags_unchanged(self):
+        with patch("smart_cloud_tag.core.AWSS3Provider") as mock_provider:
+            with patch("smart_cloud_tag.core.OpenAIProvider") as mock_llm:
+                with patch.dict("os.environ", {"API_KEY": "test-key"}):
+                    storage = mock_provider.return_value
+                    storage.list_objects.return_value = iter(["same.txt", "new.txt"])
+                    storage.is_supported_file_type.return_value = True
+                    storage.get_object_content_and_tags.side_effect = lambda key, *_: (
+                        b"Sample content",
+                        FileType.TXT,
+                        {"type": "document"} if key == "same.txt" else {},
+                    )
+                    mock_llm.return_value.generate_tags.return_value = LLMResponse(
+                        tags=["document"]
+                    )
+
+                    tagger = SmartCloudTagger(
+                        storage_uri="s3://test-bucket",
+                        tags={"type": ["document"]},
+                        skip_fully_tagged=False,
+                    )
+                    result = tagger.apply_tags()
+
+                    assert result.results["same.txt"].applied == {"type": "document"}
+                    storage.set_object_tags.assert_called_once_with(
+                        "new.txt", {"type": "document"}
+                    )
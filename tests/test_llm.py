@@ -0,0 +1,154 @@
+import json
+import openai
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from smart_cloud_tag.exceptions import LLMError
+from smart_cloud_tag.llm.gemini_provider import gemini_response_schema
+from smart_cloud_tag.llm.openai_provider import (
+    OpenAIBatchProvider,
+    parse_batch_output,
+    read_streamed_json,
+)
+from smart_cloud_tag.models import LLMRequest
+
+
+def stream_of(*deltas):
+    for delta in deltas:
+        yield SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))]
+        )
+
+
+class TestGeminiResponseSchema:
+    def test_converts_and_caches_per_tag_schema(self):
+        tags = {"type": ["doc", "image"], "owner": None}
+        schema = gemini_response_schema(tags)
+
+        assert schema == {
+            "type": "OBJECT",
+            "properties": {
+                "type": {"type": "STRING", "format": "enum", "enum": ["doc", "image"]},
+                "owner": {"type": "STRING"},
+            },
+            "required": ["type", "owner"],
+        }
+        assert gemini_response_schema(dict(tags)) is schema
+
+
+class TestReadStreamedJson:
+    def test_stops_at_complete_object(self):
+        chunks = stream_of('{"type": ', '"doc}"', "}", "unreachable")
+
+        assert read_streamed_json(chunks) == {"type": "doc}"}
+        assert next(chunks).choices[0].delta.content == "unreachable"
+
+    def test_skips_empty_chunks(self):
+        chunks = [SimpleNamespace(choices=[]), *stream_of(None, '{"a": "b"}')]
+
+        assert read_streamed_json(chunks) == {"a": "b"}
+
+    def test_empty_stream(self):
+        assert read_streamed_json(stream_of()) is None
+
+
+def batch_line(custom_id, status_code, content=None):
+    body = {"choices": [{"message": {"content": content}}]} if content else {}
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {"status_code": status_code, "body": body},
+            "error": None,
+        }
+    )
+
+
+class TestParseBatchOutput:
+    def test_maps_successful_lines_by_custom_id(self):
+        text = "\n".join(
+            [
+                batch_line("0", 200, '{"type": "document"}'),
+                batch_line("1", 500),
+                json.dumps({"custom_id": "2", "response": None, "error": {}}),
+                "",
+            ]
+        )
+
+        assert parse_batch_output(text) == {"0": '{"type": "document"}'}
+
+
+def make_batch_provider():
+    # Skips client construction, the tests only script the client's calls
+    provider = OpenAIBatchProvider.__new__(OpenAIBatchProvider)
+    provider.model = "gpt-test"
+    provider.client = MagicMock()
+    provider.poll_interval = 30
+    provider.max_retries = 2
+    return provider
+
+
+@patch("smart_cloud_tag.retry.time.sleep")
+@patch("smart_cloud_tag.llm.openai_provider.time.sleep")
+class TestOpenAIBatchProvider:
+    def test_collect_retries_only_the_failed_poll(self, mock_sleep, mock_retry_sleep):
+        provider = make_batch_provider()
+        connection_error = openai.APIConnectionError(request=None)
+        provider.client.batches.retrieve.side_effect = [
+            SimpleNamespace(status="in_progress"),
+            connection_error,
+            SimpleNamespace(status="completed", output_file_id="out"),
+        ]
+        provider.client.files.content.return_value.text = batch_line(
+            "1", 200, '{"type": "document"}'
+        )
+        requests = [
+            LLMRequest(content=name, tags={"type": None}, filename=name)
+            for name in ("a.txt", "b.txt")
+        ]
+
+        responses = provider.collect_batch("b", requests, deadline=float("inf"))
+
+        assert responses[0] is None
+        assert responses[1].tags == ["document"]
+        assert provider.client.batches.retrieve.call_count == 3
+        provider.client.batches.create.assert_not_called()
+
+    def test_collect_keeps_completed_requests_after_deadline(
+        self, mock_sleep, mock_retry_sleep
+    ):
+        provider = make_batch_provider()
+        provider.client.batches.retrieve.side_effect = [
+            SimpleNamespace(status="in_progress"),
+            SimpleNamespace(status="cancelling"),
+            SimpleNamespace(status="cancelled", output_file_id="out"),
+        ]
+        provider.client.files.content.return_value.text = batch_line(
+            "0", 200, '{"type": "document"}'
+        )
+        requests = [
+            LLMRequest(content=name, tags={"type": None}, filename=name)
+            for name in ("a.txt", "b.txt")
+        ]
+
+        responses = provider.collect_batch("b", requests, deadline=0)
+
+        provider.client.batches.cancel.assert_called_once_with("b")
+        assert responses[0].tags == ["document"]
+        assert responses[1] is None
+
+    @patch("smart_cloud_tag.llm.openai_provider.BATCH_CANCEL_GRACE_SECONDS", 0)
+    def test_collect_gives_up_on_slow_cancellation(self, mock_sleep, mock_retry_sleep):
+        provider = make_batch_provider()
+        provider.client.batches.retrieve.return_value = SimpleNamespace(
+            status="cancelling"
+        )
+
+        assert provider.collect_batch("b", [None, None], deadline=0) == [None, None]
+        provider.client.files.content.assert_not_called()
+
+    def test_collect_failed_job(self, mock_sleep, mock_retry_sleep):
+        provider = make_batch_provider()
+        provider.client.batches.retrieve.return_value = SimpleNamespace(status="failed")
+
+        with pytest.raises(LLMError):
+            provider.collect_batch("b", [], deadline=float("inf"))
@@ -9,6 +9,7 @@ from smart_cloud_tag.models import (
     LLMRequest,
     LLMResponse,
 )
+from smart_cloud_tag.schemas import create_object_tags_result
 
 
 class TestModels:
@@ -135,6 +136,27 @@ class TestModels:
         assert stats["applied"] == 1  # file3
         assert stats["success_rate"] == 1 / 3
 
+    def test_tagging_result_summary_counts_replaced_results(self):
+        config = TaggingConfig(
+            llm_model="gpt-5",
+            storage_uri="s3://test-bucket",
+            tags={"type": ["document"]},
+        )
+
+        result = TaggingResult(
+            mode=ProcessingMode.PREVIEW,
+            config=config,
+            results={"file1.txt": ObjectTags(skipped_reason="Unsupported file type")},
+        )
+        result.add_result(
+            "file1.txt", ObjectTags(existing={}, proposed={"type": "document"})
+        )
+
+        stats = result.get_summary_stats()
+        assert stats["total_objects"] == 1
+        assert stats["processed"] == 1
+        assert stats["skipped"] == 0
+
     def test_llm_request(self):
         request = LLMRequest(
             content="Sample content",
@@ -158,3 +180,23 @@ class TestModels:
         assert response.tags == ["document", "finance", "true"]
         assert response.confidence == 0.95
         assert response.reasoning == "Based on content analysis"
+
+    def test_per_object_models_are_frozen(self):
+        object_tags = ObjectTags(existing={"a": "b"})
+        response = LLMResponse(tags=["document"])
+
+        with pytest.raises(ValidationError):
+            object_tags.skipped_reason = "changed"
+        with pytest.raises(ValidationError):
+            response.tags = ["image"]
+
+    def test_untagged_skip_results_are_independent(self):
+        first = create_object_tags_result({}, skipped_reason="Unsupported file type")
+        second = create_object_tags_result({}, skipped_reason="Unsupported file type")
+
+        assert first == ObjectTags(skipped_reason="Unsupported file type")
+        assert first.existing is not second.existing
+        first.existing["owner"] = "ops"
+        assert second.existing == {}
+        with pytest.raises(ValidationError):
+            first.skipped_reason = "changed"
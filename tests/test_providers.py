@@ -0,0 +1,172 @@
+import io
+import pytest
+from unittest.mock import MagicMock, patch
+from smart_cloud_tag.models import FileType
+from smart_cloud_tag.providers.aws_s3 import AWSS3Provider
+from smart_cloud_tag.providers.base import SharedClients
+
+AWS_ENV = {
+    "AWS_ACCESS_KEY_ID": "test-key",
+    "AWS_SECRET_ACCESS_KEY": "test-secret",
+    "AWS_REGION": "us-east-1",
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_s3_clients():
+    with patch("smart_cloud_tag.providers.aws_s3._S3_CLIENTS", SharedClients()):
+        with patch("smart_cloud_tag.providers.aws_s3._session", None):
+            yield
+
+
+def s3_client_factory(mock_boto3):
+    return mock_boto3.session.Session.return_value.client
+
+
+def make_s3_provider(mock_boto3):
+    with patch.dict("os.environ", AWS_ENV):
+        provider = AWSS3Provider(storage_uri="s3://test-bucket")
+    return provider, s3_client_factory(mock_boto3).return_value
+
+
+def ranged_get_object(data):
+    def get_object(Bucket, Key, Range=None):
+        if Range is None:
+            return {"Body": io.BytesIO(data)}
+        start, end = (int(x) for x in Range[len("bytes=") :].split("-"))
+        body = data[start : end + 1]
+        return {
+            "Body": io.BytesIO(body),
+            "ContentRange": f"bytes {start}-{start + len(body) - 1}/{len(data)}",
+        }
+
+    return get_object
+
+
+class TestAWSS3Provider:
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_get_object_content_small_object(self, mock_boto3):
+        provider, client = make_s3_provider(mock_boto3)
+        client.get_object.side_effect = ranged_get_object(b"hello world")
+
+        content, file_type = provider.get_object_content("doc.txt", 5000)
+
+        assert content == b"hello world"
+        assert file_type == FileType.TXT
+        assert client.get_object.call_count == 1
+
+    @patch("smart_cloud_tag.providers.aws_s3.RANGE_CHUNK_BYTES", 4)
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_get_object_content_parallel_ranges(self, mock_boto3):
+        provider, client = make_s3_provider(mock_boto3)
+        client.get_object.side_effect = ranged_get_object(b"0123456789abcdef")
+
+        content, _ = provider.get_object_content("doc.txt", 10, concurrency=4)
+
+        assert content == b"0123456789"
+        assert client.get_object.call_count == 3
+
+    @patch("smart_cloud_tag.providers.aws_s3.RANGE_CHUNK_BYTES", 4)
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_parallel_ranges_return_bytes(self, mock_boto3):
+        provider, client = make_s3_provider(mock_boto3)
+        client.get_object.side_effect = ranged_get_object(b"0123456789abcdef")
+
+        content, _, _ = provider.get_object_content_and_tags(
+            "doc.txt", 10, concurrency=4
+        )
+
+        assert type(content) is bytes
+        assert content == b"0123456789"
+
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_client_connection_pool_size(self, mock_boto3):
+        with patch.dict("os.environ", AWS_ENV):
+            AWSS3Provider(storage_uri="s3://test-bucket", max_connections=128)
+
+        config = s3_client_factory(mock_boto3).call_args.kwargs["config"]
+        assert config.max_pool_connections == 128
+
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_get_object_content_and_tags_skips_untagged(self, mock_boto3):
+        provider, client = make_s3_provider(mock_boto3)
+        client.get_object.side_effect = ranged_get_object(b"hello world")
+
+        content, file_type, tags = provider.get_object_content_and_tags("doc.txt", 5000)
+
+        assert content == b"hello world"
+        assert tags == {}
+        client.get_object_tagging.assert_not_called()
+
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_get_object_content_and_tags_reads_tags(self, mock_boto3):
+        provider, client = make_s3_provider(mock_boto3)
+        client.get_object.return_value = {
+            "Body": io.BytesIO(b"hello world"),
+            "ContentRange": "bytes 0-10/11",
+            "TagCount": 1,
+        }
+        client.get_object_tagging.return_value = {
+            "TagSet": [{"Key": "type", "Value": "document"}]
+        }
+
+        _, _, tags = provider.get_object_content_and_tags("doc.txt", 5000)
+
+        assert tags == {"type": "document"}
+
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_list_objects_filters_by_prefix_and_suffix(self, mock_boto3):
+        with patch.dict("os.environ", AWS_ENV):
+            provider = AWSS3Provider(storage_uri="s3://test-bucket/reports/")
+        paginator = s3_client_factory(
+            mock_boto3
+        ).return_value.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {"Contents": [{"Key": "reports/"}, {"Key": "reports/a.TXT"}]},
+            {"Contents": [{"Key": "reports/b.pdf"}, {"Key": "reports/c.json"}]},
+            {},
+        ]
+
+        assert list(provider.list_objects()) == ["reports/a.TXT", "reports/c.json"]
+        paginator.paginate.assert_called_once_with(
+            Bucket="test-bucket", Prefix="reports/"
+        )
+
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_providers_share_client_until_last_close(self, mock_boto3):
+        first, client = make_s3_provider(mock_boto3)
+        with patch.dict("os.environ", AWS_ENV):
+            second = AWSS3Provider(storage_uri="s3://other-bucket")
+
+        assert second.s3_client is client
+        assert s3_client_factory(mock_boto3).call_count == 1
+
+        first.close()
+        client.close.assert_not_called()
+        second.close()
+        client.close.assert_called_once()
+
+    @patch("smart_cloud_tag.providers.aws_s3.boto3")
+    def test_repeated_close_releases_client_once(self, mock_boto3):
+        first, client = make_s3_provider(mock_boto3)
+        with patch.dict("os.environ", AWS_ENV):
+            second = AWSS3Provider(storage_uri="s3://other-bucket")
+
+        first.close()
+        first.close()
+        client.close.assert_not_called()
+        second.close()
+        client.close.assert_called_once()
+
+
+class TestSharedClients:
+    def test_new_client_after_release(self):
+        clients = SharedClients()
+        factory = MagicMock(side_effect=[object(), object()])
+        close = MagicMock()
+
+        client = clients.acquire("key", factory)
+        clients.release("key", close)
+
+        close.assert_called_once_with(client)
+        assert clients.acquire("key", factory) is not client
@@ -0,0 +1,85 @@
+import pytest
+from unittest.mock import Mock, patch
+from smart_cloud_tag.exceptions import LLMError, LLMTransientError
+from smart_cloud_tag.retry import (
+    RateLimiter,
+    backoff_delay,
+    with_batch_retries,
+    with_retries,
+)
+
+
+class TestWithRetries:
+    @patch("smart_cloud_tag.retry.time.sleep")
+    def test_retries_transient_errors(self, mock_sleep):
+        func = Mock(
+            side_effect=[LLMTransientError("429"), LLMTransientError("503"), "ok"]
+        )
+
+        assert with_retries(func, max_retries=5)("request") == "ok"
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @patch("smart_cloud_tag.retry.time.sleep")
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        func = Mock(side_effect=LLMTransientError("429"))
+
+        with pytest.raises(LLMTransientError):
+            with_retries(func, max_retries=2)("request")
+        assert func.call_count == 3
+
+    @patch("smart_cloud_tag.retry.time.sleep")
+    def test_does_not_retry_other_errors(self, mock_sleep):
+        func = Mock(side_effect=LLMError("bad request"))
+
+        with pytest.raises(LLMError):
+            with_retries(func)("request")
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_backoff_delay_bounds(self):
+        for attempt in range(10):
+            delay = backoff_delay(attempt, min_wait=1, max_wait=8)
+            assert 1 <= delay <= min(8, 2**attempt)
+
+
+class TestRateLimiter:
+    @patch("smart_cloud_tag.retry.time.sleep")
+    def test_waits_once_tokens_are_spent(self, mock_sleep):
+        limiter = RateLimiter(rate_per_minute=60)
+
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+
+        mock_sleep.side_effect = lambda seconds: setattr(
+            limiter, "_updated", limiter._updated - seconds
+        )
+        limiter.acquire()
+        assert mock_sleep.call_count == 1
+        assert mock_sleep.call_args.args[0] == pytest.approx(1, abs=0.1)
+
+    @patch("smart_cloud_tag.retry.time.sleep")
+    def test_batch_retries_only_failed_requests(self, mock_sleep):
+        transient = LLMTransientError("429")
+        error = LLMError("bad request")
+        func = Mock(side_effect=[["a", transient, error], ["b"]])
+
+        assert with_batch_retries(func)(["1", "2", "3"]) == ["a", "b", error]
+        assert func.call_args_list[1].args[0] == ["2"]
+
+    def test_batch_takes_one_token_per_request(self):
+        limiter = Mock()
+        func = Mock(return_value=["a", "b", "c"])
+
+        assert with_batch_retries(func, limiter)(["1", "2", "3"]) == ["a", "b", "c"]
+        limiter.acquire.assert_called_once_with(3)
+
+    @patch("smart_cloud_tag.retry.time.sleep")
+    def test_batch_larger_than_capacity_is_paced(self, mock_sleep):
+        limiter = RateLimiter(rate_per_minute=60)
+        mock_sleep.side_effect = lambda seconds: setattr(
+            limiter, "_updated", limiter._updated - seconds
+        )
+
+        limiter.acquire(3)
+        assert mock_sleep.call_count == 2
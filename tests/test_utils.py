@@ -1,5 +1,10 @@
 import pytest
+from unittest.mock import patch
 from smart_cloud_tag.utils import (
+    ORJSON_AVAILABLE,
+    decode_text_content,
+    build_tag_response_schema,
+    parse_structured_llm_response,
     parse_s3_uri,
     is_supported_file_type,
     get_file_type,
@@ -7,8 +12,16 @@ from smart_cloud_tag.utils import (
     parse_file_content,
     truncate_content,
     format_llm_prompt,
+    format_custom_llm_prompt,
+    compile_llm_prompt,
+    get_compiled_llm_prompt,
+    render_llm_prompt,
     parse_llm_response,
+    merge_tags,
+    prefetch,
+    split_byte_range,
 )
+from smart_cloud_tag.config import DEFAULT_PROMPT_TEMPLATE
 from smart_cloud_tag.models import FileType
 from smart_cloud_tag.exceptions import FileProcessingError
 
@@ -33,6 +46,19 @@ class TestUtils:
         assert is_supported_file_type("test.pdf") == False
         assert is_supported_file_type("test") == False
 
+    def test_prefetch_preserves_order(self):
+        assert list(prefetch(iter(range(100)), 4)) == list(range(100))
+
+    def test_prefetch_reraises_listing_error(self):
+        def failing_listing():
+            yield "a.txt"
+            raise ValueError("listing failed")
+
+        items = prefetch(failing_listing(), 4)
+        assert next(items) == "a.txt"
+        with pytest.raises(ValueError, match="listing failed"):
+            next(items)
+
     def test_get_file_type(self):
         assert get_file_type("test.txt") == FileType.TXT
         assert get_file_type("test.md") == FileType.MD
@@ -40,6 +66,8 @@ class TestUtils:
         assert get_file_type("test.csv") == FileType.CSV
         assert get_file_type("test.pdf") == None
         assert get_file_type("test") == None
+        assert get_file_type("txt") == None
+        assert get_file_type("reports/2024.v2/Notes.TXT") == FileType.TXT
 
     def test_detect_mime_type(self):
         assert detect_mime_type(b'{"key": "value"}') == "application/json"
@@ -61,6 +89,34 @@ class TestUtils:
         assert "Headers: name, age" in result
         assert "Row 1: John, 30" in result
 
+    @patch("smart_cloud_tag.utils.ORJSON_AVAILABLE", False)
+    def test_parse_file_content_stops_at_max_bytes(self):
+        json_content = (
+            b'{"items": [' + b",".join([b'"\xc3\xa9t\xc3\xa9"'] * 500) + b"]}"
+        )
+        csv_content = b"name,age\n" + b"J\xc3\xa9r\xc3\xb4me,30\n" * 500
+
+        for content, file_type in [
+            (json_content, FileType.JSON),
+            (csv_content, FileType.CSV),
+        ]:
+            full = parse_file_content(content, file_type)
+            partial = parse_file_content(content, file_type, max_bytes=100)
+
+            assert len(partial) < len(full)
+            assert truncate_content(partial, 100) == truncate_content(full, 100)
+
+    @pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+    def test_parse_file_content_orjson_stops_at_max_bytes(self):
+        content = b'{"items": [' + b",".join([b'"\xc3\xa9t\xc3\xa9"'] * 500) + b"]}"
+
+        full = parse_file_content(content, FileType.JSON)
+        partial = parse_file_content(content, FileType.JSON, max_bytes=101)
+
+        assert full.startswith('{\n  "items": [\n    "\u00e9t\u00e9"')
+        assert len(partial.encode("utf-8")) <= 101
+        assert truncate_content(partial, 101) == truncate_content(full, 101)
+
     def test_parse_file_content_txt(self):
         content = b"This is plain text"
         result = parse_file_content(content, FileType.TXT)
@@ -90,6 +146,9 @@ class TestUtils:
         assert "Sample content" in prompt
         assert "type: must be one of ['document', 'image']" in prompt
         assert "category: deduce appropriate value" in prompt
+        assert '{"type": "invoice", "department": "finance"}' in prompt
+        assert "separated by commas" not in prompt
+        assert prompt.endswith("JSON object:")
 
     def test_format_llm_prompt_empty_filename(self):
         tags = {"type": ["document"]}
@@ -125,3 +184,91 @@ class TestUtils:
 
         result = parse_llm_response(response, tag_keys)
         assert result == ["document", "finance", "true"]
+
+    def test_split_byte_range(self):
+        assert split_byte_range(0, 10, 4) == [(0, 3), (4, 7), (8, 9)]
+        assert split_byte_range(4, 8, 4) == [(4, 7)]
+        assert split_byte_range(8, 8, 4) == []
+
+    def test_render_compiled_default_prompt(self):
+        tags = {"type": ["document", "image"], "category": None}
+        compiled = compile_llm_prompt(tags)
+
+        prompt = render_llm_prompt(compiled, "Sample {content}", "test.txt")
+        assert prompt == DEFAULT_PROMPT_TEMPLATE.format(
+            num_tags=2,
+            constraints_text=(
+                "- type: must be one of ['document', 'image']\n"
+                "- category: deduce appropriate value based on content and key name"
+            ),
+            filename_context="\nFile being analyzed: test.txt\n",
+            content_preview="Sample {content}",
+        )
+        assert prompt == format_llm_prompt(tags, "Sample {content}", "test.txt")
+
+    def test_render_compiled_custom_prompt(self):
+        tags = {"type": ["document", "image"]}
+        template = "Tag {filename} with {tags} ({tags!r}):\n{content} {{literal}}"
+        compiled = compile_llm_prompt(tags, template)
+
+        prompt = render_llm_prompt(compiled, "Sample content", "test.txt")
+        assert prompt == format_custom_llm_prompt(
+            template, tags, "Sample content", "test.txt"
+        )
+
+    def test_compiled_prompt_reused_per_tag_set(self):
+        tags = {"type": ["document", "image"], "category": None}
+        compiled = get_compiled_llm_prompt(tags)
+
+        assert get_compiled_llm_prompt(dict(tags)) is compiled
+        assert get_compiled_llm_prompt(tags, "{tags} {content} {filename}") is not (
+            compiled
+        )
+        prompt = render_llm_prompt(compiled, "Sample content", "test.txt")
+        assert prompt == format_llm_prompt(tags, "Sample content", "test.txt")
+
+    def test_compile_custom_prompt_invalid(self):
+        tags = {"type": ["document"]}
+
+        with pytest.raises(ValueError):
+            compile_llm_prompt(tags, "Missing placeholders {content}")
+
+        with pytest.raises(ValueError):
+            compile_llm_prompt(tags, "{tags} {content} {filename} {unknown}")
+
+    def test_build_tag_response_schema(self):
+        tags = {"type": ["document", "image"], "summary": None}
+
+        schema = build_tag_response_schema(tags)
+        assert schema == {
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": ["document", "image"]},
+                "summary": {"type": "string"},
+            },
+            "required": ["type", "summary"],
+            "additionalProperties": False,
+        }
+        assert build_tag_response_schema(dict(tags)) is schema
+
+    def test_parse_structured_llm_response(self):
+        result = parse_structured_llm_response(
+            {"summary": " Report ", "type": "document"}, ["type", "summary", "owner"]
+        )
+        assert result == ["document", "Report", "general"]
+
+    def test_decode_text_content(self):
+        assert decode_text_content(b"Hello, world!", 5) == "Hello"
+        # The two-byte "\xc3\xa9" is split by the cut and dropped
+        assert decode_text_content("caf\u00e9 au lait".encode("utf-8"), 4) == "caf"
+        assert decode_text_content("caf\u00e9".encode("utf-8"), 100) == "caf\u00e9"
+        # Invalid bytes before the cut are an error, not silently dropped
+        with pytest.raises(FileProcessingError):
+            decode_text_content(b"caf\xe9 au lait", 100)
+
+    def test_merge_tags_uses_provider_limit(self):
+        existing = {f"k{i}": "v" for i in range(12)}
+        merged = merge_tags(existing, {"k0": "new"}, ["k0"], provider="gcp")
+        assert len(merged) == 12 and merged["k0"] == "new"
+        with pytest.raises(ValueError):
+            merge_tags(existing, {"k0": "new"}, ["k0"])